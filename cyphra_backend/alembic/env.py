@@ -12,6 +12,7 @@ from app.core.database import SQLALCHEMY_DATABASE_URL, Base
 from app.campaigns.models import *
 from app.ai_agents.models import *
 from app.ai_training.models import *
+from app.seal.models import *
 
 
 
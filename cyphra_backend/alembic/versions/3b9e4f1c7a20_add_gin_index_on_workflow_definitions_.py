@@ -0,0 +1,30 @@
+"""add gin index on workflow_definitions definition
+
+Revision ID: 3b9e4f1c7a20
+Revises: 07d17bff5bf2
+Create Date: 2026-10-16 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e4f1c7a20'
+down_revision: Union[str, None] = '07d17bff5bf2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The column was moved to jsonb in 0d81d272a6cb; this adds the GIN index for containment (@>) lookups.
+    # CONCURRENTLY can't run inside a transaction; build without locking writes to workflow_definitions.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_workflow_definitions_definition_gin', 'workflow_definitions', ['definition'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_workflow_definitions_definition_gin', table_name='workflow_definitions', postgresql_using='gin', postgresql_concurrently=True)
@@ -0,0 +1,28 @@
+"""add wallet/created_at covering index on workflow_definitions
+
+Revision ID: 5d2a8c6e1f43
+Revises: 3b9e4f1c7a20
+Create Date: 2026-10-16 10:03:27.581934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8c6e1f43'
+down_revision: Union[str, None] = '3b9e4f1c7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_workflow_definitions_wallet_created', 'workflow_definitions', ['wallet_address', sa.text('created_at DESC'), 'workflow_id_api'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_workflow_definitions_wallet_created', table_name='workflow_definitions', postgresql_concurrently=True)
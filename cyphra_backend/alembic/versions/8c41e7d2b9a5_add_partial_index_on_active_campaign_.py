@@ -0,0 +1,29 @@
+"""add partial index on active campaign expiration
+
+Revision ID: 8c41e7d2b9a5
+Revises: 5d2a8c6e1f43
+Create Date: 2026-10-16 11:42:08.213570
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e7d2b9a5'
+down_revision: Union[str, None] = '5d2a8c6e1f43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # mark_expired_campaigns_inactive keeps updating campaigns while this builds.
+    with op.get_context().autocommit_block():
+        op.create_index('idx_campaign_active_exp', 'campaigns', ['expiration'], unique=False, postgresql_where=sa.text('is_active = true'), sqlite_where=sa.text('is_active = 1'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_campaign_active_exp', table_name='campaigns', postgresql_concurrently=True)
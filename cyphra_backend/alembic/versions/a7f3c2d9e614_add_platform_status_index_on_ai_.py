@@ -0,0 +1,29 @@
+"""add platform/status partial index on ai_training_jobs
+
+Revision ID: a7f3c2d9e614
+Revises: 8c41e7d2b9a5
+Create Date: 2026-10-16 12:15:44.907316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7f3c2d9e614'
+down_revision: Union[str, None] = '8c41e7d2b9a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The HF status checks keep committing ai_training_jobs updates while this builds.
+    with op.get_context().autocommit_block():
+        op.create_index('idx_aitj_platform_status', 'ai_training_jobs', ['platform', 'status'], unique=False, postgresql_where=sa.text('user_credential_id IS NOT NULL'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_aitj_platform_status', table_name='ai_training_jobs', postgresql_concurrently=True)
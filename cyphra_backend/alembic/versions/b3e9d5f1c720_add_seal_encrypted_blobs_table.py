@@ -0,0 +1,40 @@
+"""add seal_encrypted_blobs table
+
+Revision ID: b3e9d5f1c720
+Revises: a7f3c2d9e614
+Create Date: 2026-10-16 14:02:31.518240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9d5f1c720'
+down_revision: Union[str, None] = 'a7f3c2d9e614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('seal_encrypted_blobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('policy_id', sa.String(), nullable=False),
+    sa.Column('campaign_id', sa.String(), nullable=True),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('threshold', sa.Integer(), nullable=False),
+    sa.Column('encrypted_shares', sa.JSON(), nullable=False),
+    sa.Column('ciphertext', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_seal_encrypted_blobs_policy_id'), 'seal_encrypted_blobs', ['policy_id'], unique=True)
+    op.create_index(op.f('ix_seal_encrypted_blobs_campaign_id'), 'seal_encrypted_blobs', ['campaign_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_seal_encrypted_blobs_campaign_id'), table_name='seal_encrypted_blobs')
+    op.drop_index(op.f('ix_seal_encrypted_blobs_policy_id'), table_name='seal_encrypted_blobs')
+    op.drop_table('seal_encrypted_blobs')
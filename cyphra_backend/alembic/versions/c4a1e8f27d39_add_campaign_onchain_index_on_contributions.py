@@ -0,0 +1,29 @@
+"""add covering (campaign_id, onchain_contribution_id) index on contributions
+
+Revision ID: c4a1e8f27d39
+Revises: b3e9d5f1c720
+Create Date: 2026-10-16 15:10:52.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a1e8f27d39'
+down_revision: Union[str, None] = 'b3e9d5f1c720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # INCLUDE lets the /walrus/download lookup run as an index-only scan.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contribution_campaign_onchain', 'contributions', ['campaign_id', 'onchain_contribution_id'], unique=False, postgresql_include=['data_url', 'file_type'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_contribution_campaign_onchain', table_name='contributions', postgresql_concurrently=True)
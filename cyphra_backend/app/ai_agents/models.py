@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, func as sql_func, Index
+from sqlalchemy import Column, String, DateTime, JSON as SQLJSON, func as sql_func, Index
 from sqlalchemy.dialects.postgresql import JSONB
 
 from app.core.database import Base
@@ -12,8 +12,14 @@ class WorkflowDefinitionDB(Base):
     workflow_id_api = Column(String, unique=True, index=True, nullable=False) # API-facing ID
     name = Column(String, index=True, nullable=False)
     wallet_address = Column(String, index=True, nullable=False) # Creator's wallet
-    definition = Column(JSONB, nullable=False) # Stores the WFWorkflowDefinition TypedDict
+    # JSONB on Postgres (binary, GIN-indexable); plain JSON elsewhere, e.g. local SQLite.
+    definition = Column(SQLJSON().with_variant(JSONB(), "postgresql"), nullable=False) # Stores the WFWorkflowDefinition TypedDict
     created_at = Column(DateTime(timezone=True), server_default=sql_func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=sql_func.now())
 
-    __table_args__ = (Index("ix_workflow_definitions_wallet_name", "wallet_address", "name"),)
\ No newline at end of file
+    __table_args__ = (
+        Index("ix_workflow_definitions_wallet_name", "wallet_address", "name"),
+        Index("ix_workflow_definitions_definition_gin", "definition", postgresql_using="gin"),
+        # Covers the /by-wallet listing: filter on wallet, ORDER BY created_at DESC without a sort step.
+        Index("ix_workflow_definitions_wallet_created", "wallet_address", created_at.desc(), "workflow_id_api"),
+    )
\ No newline at end of file
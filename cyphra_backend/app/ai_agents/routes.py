@@ -1,18 +1,22 @@
 import os
+import asyncio
 import httpx
 import json
 import logging
-import requests
 import uuid
 # import aioredis
 import redis.asyncio as aioredis
 from typing import List, Dict, Any, Optional, Union
 
 from fastapi import FastAPI, HTTPException, Depends, APIRouter, Body, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from celery import group
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session # Assuming you'll integrate SQLAlchemy session for some operations
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.celery.celery import run_verification_workflow
+from app.core.database import get_async_session
 from app.ai_agents.schemas import (
     WorkflowCreateRequest,
     WorkflowRunDetailRequest,
@@ -29,12 +33,19 @@ from app.ai_agents.services import (
     WORKFLOW_DEFINITIONS_STORE,
     get_workflow_def_from_cache_or_db,
     cache_workflow_def,
+    dialect_insert,
     get_or_create_dataset_verifier_workflow_def,
     invalidate_workflow_def_cache,
     get_workflow_manager_instance,
+    stream_workflows_by_wallet,
+    run_workflow_and_store_result,
+    store_workflow_run_result,
+    store_pending_workflow_runs,
+    get_workflow_run_result,
 )
 from app.ai_agents.models import WorkflowDefinitionDB
-from app.core.redis import get_redis_pool, get_redis_connection
+from app.core.redis import get_redis
+from app.core.http import get_http_client
 
 
 try:
@@ -60,7 +71,6 @@ except ImportError as e:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
 logger = logging.getLogger("MultiAgentAPI")
 
-
 multi_agent_router = APIRouter(prefix="/agent-workflows", tags=["Multi-Agent Workflows"])
 
 
@@ -151,51 +161,55 @@ async def get_available_llms():
 )
 async def define_workflow(
     payload: WorkflowDefinitionIn,
-    db: Session = Depends(get_session),
-    redis: aioredis.Redis = Depends(get_redis_connection)
+    db: AsyncSession = Depends(get_async_session),
+    redis: aioredis.Redis = Depends(get_redis)
 ):
     # Generate a unique API-facing ID for the workflow
     # This could also be derived from payload.name if desired, ensuring uniqueness
     workflow_id_api = f"{payload.name.lower().replace(' ', '_')}_{str(uuid.uuid4())[:8]}"
     
-    existing_workflow_by_api_id = db.query(WorkflowDefinitionDB).filter(WorkflowDefinitionDB.workflow_id_api == workflow_id_api).first()
-    logger.info("Existing workflow by API ID: {}", existing_workflow_by_api_id)
-    if existing_workflow_by_api_id:
-        logger.error(f"Generated workflow_id_api '{workflow_id_api}' already exists. Try a different name or it's a hash collision.")
-        raise HTTPException(status_code=409, detail=f"Generated workflow_id_api '{workflow_id_api}' already exists. Try a different name or it's a hash collision.")
-
-    # Basic validation of the definition structure (can be more sophisticated)
-    if not all(k in payload.definition_payload.model_dump() for k in ["name", "agent_configs", "nodes", "edges", "start_node_id"]):
-        logger.error("Invalid workflow definition payload. Missing required fields.")
-        raise HTTPException(status_code=400, detail="Invalid workflow definition payload. Missing required fields.")
-    if payload.definition_payload.model_dump()["name"] != payload.name:
+    # Required fields (name, agent_configs, nodes, edges, start_node_id) are enforced by the
+    # WFWorkflowDefinition model while FastAPI parses the request body.
+    definition = payload.definition_payload.model_dump(mode="json")
+    if definition["name"] != payload.name:
         logger.warning("Mismatch between payload.name and definition_payload.name. Using payload.name for DB.")
-        payload.definition_payload.model_dump()["name"] = payload.name # Ensure consistency
-
-    db_workflow = WorkflowDefinitionDB(
-        workflow_id_api=workflow_id_api,
-        name=payload.name,
-        wallet_address=payload.wallet_address,
-        definition=payload.definition_payload.model_dump()
+        definition["name"] = payload.name # Ensure consistency
+    # One round-trip: the unique workflow_id_api turns a collision into an empty RETURNING instead of a pre-check SELECT.
+    stmt = (
+        dialect_insert(db)(WorkflowDefinitionDB)
+        .values(
+            workflow_id_api=workflow_id_api,
+            name=payload.name,
+            wallet_address=payload.wallet_address,
+            definition=definition
+        )
+        .on_conflict_do_nothing(index_elements=["workflow_id_api"])
+        .returning(WorkflowDefinitionDB.id, WorkflowDefinitionDB.created_at, WorkflowDefinitionDB.updated_at)
     )
-    db.add(db_workflow)
     try:
-        db.commit()
-        db.refresh(db_workflow)
-        await cache_workflow_def(workflow_id_api, db_workflow.definition, redis)
-        logger.info(f"Defined and cached new workflow: ID='{db_workflow.id}', API_ID='{workflow_id_api}' by wallet '{payload.wallet_address}'")
-        
-        # Construct response manually to ensure definition_payload is included correctly
-        return WorkflowDefinitionResponse(
-            workflow_id_api=db_workflow.workflow_id_api,
-            name=db_workflow.name,
-            wallet_address=db_workflow.wallet_address,
-            definition_payload=payload.definition_payload.model_dump(),
-            created_at=db_workflow.created_at,
-            updated_at=db_workflow.updated_at
+        inserted = (await db.execute(stmt)).first()
+        if inserted is None:
+            await db.rollback()
+            logger.error(f"Generated workflow_id_api '{workflow_id_api}' already exists. Try a different name or it's a hash collision.")
+            raise HTTPException(status_code=409, detail=f"Generated workflow_id_api '{workflow_id_api}' already exists. Try a different name or it's a hash collision.")
+        await db.commit()
+
+        db_workflow = WorkflowDefinitionDB(
+            id=inserted.id,
+            workflow_id_api=workflow_id_api,
+            name=payload.name,
+            wallet_address=payload.wallet_address,
+            definition=definition,
+            created_at=inserted.created_at,
+            updated_at=inserted.updated_at
         )
+        data = await cache_workflow_def(db_workflow, redis)
+        logger.info(f"Defined and cached new workflow: ID='{inserted.id}', API_ID='{workflow_id_api}' by wallet '{payload.wallet_address}'")
+        return WorkflowDefinitionResponse.model_validate(data)
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error defining workflow: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Could not save workflow definition: {str(e)}")
 
@@ -203,60 +217,40 @@ async def define_workflow(
 @multi_agent_router.get("/{workflow_id_api}", response_model=WorkflowDefinitionResponse)
 async def get_workflow_definition(
     workflow_id_api: str,
-    db: Session = Depends(get_session),
-    redis: aioredis.Redis = Depends(get_redis_connection)
+    db: AsyncSession = Depends(get_async_session),
+    redis: aioredis.Redis = Depends(get_redis)
 ):
-    workflow_def_db = await get_workflow_def_from_cache_or_db(
+    workflow_def = await get_workflow_def_from_cache_or_db(
         workflow_id_api=workflow_id_api,
         db=db,
         redis=redis
     )
-    logger.info(f"Workflow definition from cache or DB: {workflow_def_db}")
-    if not workflow_def_db:
+    if not workflow_def:
         raise HTTPException(status_code=404, detail=f"Workflow with API ID '{workflow_id_api}' not found.")
-    
-    if isinstance(workflow_def_db, dict):
-        logger.info("Workflow definition is a dictionary")
-        logger.info("Workflow definition: {}", workflow_def_db)
-        return WorkflowDefinitionResponse(
-            workflow_id_api=workflow_def_db.get("workflow_id_api"),
-            name=workflow_def_db.get("name"),
-            wallet_address=workflow_def_db.get("wallet_address"),
-            definition_payload=workflow_def_db.get("definition"),
-            created_at=workflow_def_db.get("created_at"),
-            updated_at=workflow_def_db.get("updated_at"),
-        )
-    else:
-        logger.info("Workflow definition is a WorkflowDefinitionDB object")
-        return WorkflowDefinitionResponse(
-            workflow_id_api=workflow_def_db.workflow_id_api,
-            name=workflow_def_db.name,
-            wallet_address=workflow_def_db.wallet_address,
-            definition_payload=workflow_def_db.definition,
-            created_at=workflow_def_db.created_at,
-            updated_at=workflow_def_db.updated_at,
-        )
+    return workflow_def
 
 
-@multi_agent_router.get("/by-wallet/{wallet_address}", response_model=List[WorkflowDefinitionResponse])
+@multi_agent_router.get(
+    "/by-wallet/{wallet_address}",
+    response_class=StreamingResponse,
+    responses={200: {"model": List[WorkflowDefinitionResponse], "description": "The wallet's workflow definitions, newest first, streamed as one JSON array."}},
+)
 async def get_workflows_by_wallet(
     wallet_address: str,
-    db: Session = Depends(get_session)
+    redis: aioredis.Redis = Depends(get_redis)
 ):
-    workflows = db.query(WorkflowDefinitionDB).filter(WorkflowDefinitionDB.wallet_address == wallet_address).order_by(WorkflowDefinitionDB.created_at.desc()).all()
-    if not workflows:
-        logger.info(f"No workflows found for wallet: {wallet_address}")
-        return []
-    return [WorkflowDefinitionResponse.from_orm(wf) for wf in workflows]
+    return StreamingResponse(stream_workflows_by_wallet(wallet_address, redis), media_type="application/json")
 
 @multi_agent_router.put("/{workflow_id_api}", response_model=WorkflowDefinitionResponse)
 async def update_workflow_definition(
     workflow_id_api: str,
     payload: WorkflowDefinitionIn, # Reuses the create schema
-    db: Session = Depends(get_session),
-    redis: aioredis.Redis = Depends(get_redis_connection)
+    db: AsyncSession = Depends(get_async_session),
+    redis: aioredis.Redis = Depends(get_redis)
 ):
-    db_workflow = db.query(WorkflowDefinitionDB).filter(WorkflowDefinitionDB.workflow_id_api == workflow_id_api).first()
+    db_workflow = (await db.execute(
+        select(WorkflowDefinitionDB).where(WorkflowDefinitionDB.workflow_id_api == workflow_id_api)
+    )).scalar_one_or_none()
     logger.info("Fetching workflow with details: {}", db_workflow)
     if not db_workflow:
         logger.error(f"Workflow with API ID '{workflow_id_api}' not found.")
@@ -265,17 +259,17 @@ async def update_workflow_definition(
     # Update fields
     db_workflow.name = payload.name
     db_workflow.wallet_address = payload.wallet_address # Or disallow changing owner
-    db_workflow.definition = payload.definition_payload.model_dump()
+    db_workflow.definition = payload.definition_payload.model_dump(mode="json")
     # updated_at is handled by onupdate
 
     try:
-        db.commit()
-        db.refresh(db_workflow)
-        await cache_workflow_def(workflow_id_api, db_workflow.definition, redis) # Re-cache
+        await db.commit()
+        await db.refresh(db_workflow)
+        await cache_workflow_def(db_workflow, redis) # Re-cache
         logger.info(f"Updated and re-cached workflow: API_ID='{workflow_id_api}'")
-        return WorkflowDefinitionResponse.from_orm(db_workflow)
+        return WorkflowDefinitionResponse.model_validate(db_workflow)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating workflow {workflow_id_api}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Could not update workflow: {str(e)}")
 
@@ -283,21 +277,23 @@ async def update_workflow_definition(
 @multi_agent_router.delete("/{workflow_id_api}", status_code=204)
 async def delete_workflow_definition(
     workflow_id_api: str,
-    db: Session = Depends(get_session),
-    redis: aioredis.Redis = Depends(get_redis_connection)
+    db: AsyncSession = Depends(get_async_session),
+    redis: aioredis.Redis = Depends(get_redis)
 ):
-    db_workflow = db.query(WorkflowDefinitionDB).filter(WorkflowDefinitionDB.workflow_id_api == workflow_id_api).first()
+    db_workflow = (await db.execute(
+        select(WorkflowDefinitionDB).where(WorkflowDefinitionDB.workflow_id_api == workflow_id_api)
+    )).scalar_one_or_none()
     if not db_workflow:
         raise HTTPException(status_code=404, detail=f"Workflow with API ID '{workflow_id_api}' not found.")
     
     try:
-        db.delete(db_workflow)
-        db.commit()
+        await db.delete(db_workflow)
+        await db.commit()
         await invalidate_workflow_def_cache(workflow_id_api, redis)
         logger.info(f"Deleted workflow: API_ID='{workflow_id_api}'")
         return
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting workflow {workflow_id_api}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Could not delete workflow: {str(e)}")
 
@@ -307,8 +303,8 @@ async def run_workflow_by_id(
     workflow_id_api: str,
     run_request: WorkflowRunDetailRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_session),
-    redis: aioredis.Redis = Depends(get_redis_connection)
+    db: AsyncSession = Depends(get_async_session),
+    redis: aioredis.Redis = Depends(get_redis)
 ):
     workflow_def_payload = await get_workflow_def_from_cache_or_db(workflow_id_api, db, redis)
     logger.info(f"Workflow definition from cache or DB: {workflow_def_payload}")
@@ -327,32 +323,35 @@ async def run_workflow_by_id(
         thread_id = run_request.thread_id or str(uuid.uuid4())
         logger.info(f"Thread ID: {thread_id}")
 
-        # For actual background execution:
-        # background_tasks.add_task(manager.run_workflow, initial_input, thread_id)
-        # return WorkflowRunResponse(thread_id=thread_id, status="PENDING", message="Workflow started in background.")
-        
-        # Synchronous execution for this example:
-        final_state = manager.run_workflow(initial_input, thread_id=thread_id)
-        logger.info(f"Workflow run completed for API_ID='{workflow_id_api}', thread_id='{thread_id}', final_state={final_state}")
-        
+        await store_workflow_run_result(thread_id, "PENDING", redis)
+        background_tasks.add_task(run_workflow_and_store_result, manager, initial_input, thread_id, redis)
         return WorkflowRunResponse(
             thread_id=thread_id,
-            status="COMPLETED" if "error" not in final_state else "ERROR",
-            final_state=final_state,
-            message=final_state.get("error")
+            status="PENDING",
+            message=f"Workflow started in background. Poll /agent-workflows/runs/{thread_id} for the result."
         )
     except Exception as e:
         logger.error(f"Error running workflow '{workflow_id_api}': {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to run workflow: {str(e)}")
 
 
+@multi_agent_router.get("/runs/{thread_id}", response_model=WorkflowRunResponse)
+async def get_workflow_run(
+    thread_id: str,
+    redis: aioredis.Redis = Depends(get_redis)
+):
+    run_result = await get_workflow_run_result(thread_id, redis)
+    if not run_result:
+        raise HTTPException(status_code=404, detail=f"No workflow run found for thread ID '{thread_id}'. Results expire after 24 hours.")
+    return run_result
+
 
 # @multi_agent_router.post("/verify-contribution", response_model=WorkflowRunResponse)
 # async def verify_dataset_contribution(
 #     request: ContributionVerificationRequest,
 #     background_tasks: BackgroundTasks,
-#     db: Session = Depends(get_session),
-#     redis: aioredis.Redis = Depends(get_redis_connection)
+#     db: AsyncSession = Depends(get_async_session),
+#     redis: aioredis.Redis = Depends(get_redis)
 # ):
 #     verifier_workflow_def = await get_or_create_dataset_verifier_workflow_def(db, redis)
 #     task_description = (
@@ -370,7 +369,7 @@ async def run_workflow_by_id(
 #         manager = get_workflow_manager_instance(verifier_workflow_def)
 #         initial_input = {"task_description": task_description, "initial_scratchpad": initial_scratchpad}
 #         thread_id = f"verify_contrib_{request.contribution_id}_{str(uuid.uuid4())[:8]}"
-#         final_state = manager.run_workflow(initial_input, thread_id=thread_id) # Synchronous for now
+#         final_state = await asyncio.to_thread(manager.run_workflow, initial_input, thread_id=thread_id)
 #         return WorkflowRunResponse(
 #             thread_id=thread_id,
 #             status="COMPLETED" if "error" not in final_state else "ERROR",
@@ -385,17 +384,16 @@ async def run_workflow_by_id(
 @multi_agent_router.post("/verify-campaign-dataset", response_model=Dict[str, Any])
 async def verify_campaign_dataset(
     request: CampaignVerificationRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_session),
-    redis: aioredis.Redis = Depends(get_redis_connection)
+    redis: aioredis.Redis = Depends(get_redis),
+    http_client: httpx.AsyncClient = Depends(get_http_client)
 ):
     logger.info(f"Verifying dataset for campaign: {request.onchain_campaign_id}, sample: {request.sample_size}")
-    if not WF_CONFIG.FASTAPI_BASE_URL or not requests:
+    if not WF_CONFIG.FASTAPI_BASE_URL:
         raise HTTPException(status_code=500, detail="Campaign data access not configured.")
 
     contributions_endpoint = f"{WF_CONFIG.FASTAPI_BASE_URL}/campaigns/get-contributions/{request.onchain_campaign_id}"
     try:
-        response = requests.get(contributions_endpoint, timeout=15)
+        response = await http_client.get(contributions_endpoint)
         response.raise_for_status()
         contributions_data = response.json()
         contributions_to_verify = contributions_data.get("contributions", [])
@@ -407,22 +405,36 @@ async def verify_campaign_dataset(
     if request.sample_size and request.sample_size < len(contributions_to_verify):
         contributions_to_verify = contributions_to_verify[:request.sample_size]
 
-    verifier_workflow_def = await get_or_create_dataset_verifier_workflow_def(db, redis)
-    manager = get_workflow_manager_instance(verifier_workflow_def)
-    num_triggered = 0
-    for contrib_item in contributions_to_verify:
-        contribution_id = contrib_item.get("contribution_id")
-        data_url = contrib_item.get("data_url")
-        if not contribution_id: continue
-        task_desc = f"Verify contribution ID '{contribution_id}'. Data URL: '{data_url}'."
-        init_scratch = {"contribution_id": contribution_id, "onchain_campaign_id": request.onchain_campaign_id, "data_url_input": data_url}
-        thread_id = f"verify_campaign_{request.onchain_campaign_id}_contrib_{contribution_id}_{str(uuid.uuid4())[:4]}"
-        background_tasks.add_task(manager.run_workflow, {"task_description": task_desc, "initial_scratchpad": init_scratch}, thread_id)
-        num_triggered += 1
+    queued = [
+        {
+            "contribution_id": contrib_item["contribution_id"],
+            "data_url": contrib_item.get("data_url"),
+            "thread_id": f"verify_campaign_{request.onchain_campaign_id}_contrib_{contrib_item['contribution_id']}_{str(uuid.uuid4())[:4]}",
+        }
+        for contrib_item in contributions_to_verify
+        if contrib_item.get("contribution_id")
+    ]
+    # Workflows run on Celery workers; one group publish covers the whole batch, so this
+    # request returns in constant time regardless of how many contributions there are.
+    await store_pending_workflow_runs([item["thread_id"] for item in queued], redis)
+    verification_batch = group(
+        run_verification_workflow.s(item["contribution_id"], request.onchain_campaign_id, item["data_url"], item["thread_id"])
+        for item in queued
+    )
+    try:
+        await asyncio.to_thread(verification_batch.apply_async)
+    except Exception as e:
+        logger.error(f"Failed to enqueue verification for campaign {request.onchain_campaign_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=503, detail=f"Could not enqueue verification workflows: {str(e)}")
+
     return {
-        "message": f"Triggered verification for {num_triggered} contributions. Processing in background.",
-        "triggered_count": num_triggered,
-        "total_found_in_campaign": len(contributions_data.get("contributions", []))
+        "message": f"Queued verification for {len(queued)} contributions. Poll /agent-workflows/runs/{{thread_id}} for each result.",
+        "triggered_count": len(queued),
+        "total_found_in_campaign": len(contributions_data.get("contributions", [])),
+        "results": [
+            {"contribution_id": item["contribution_id"], "thread_id": item["thread_id"], "status": "PENDING"}
+            for item in queued
+        ],
     }
 
 
@@ -1,6 +1,6 @@
 
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 from datetime import datetime
 
 from app.ai_agents.enterprise_workflow import  WorkflowDefinition as WFWorkflowDefinition
@@ -85,16 +85,16 @@ class WorkflowDefinitionIn(BaseModel):
 
 
 class WorkflowDefinitionResponse(BaseModel):
+  model_config = ConfigDict(from_attributes=True)
+
   workflow_id_api: str
   name: str
   wallet_address: str
-  definition_payload: WFWorkflowDefinition
+  # ORM rows expose the payload as `definition`; accept either so model_validate(db_workflow) works.
+  definition_payload: WFWorkflowDefinition = Field(validation_alias=AliasChoices("definition_payload", "definition"))
   created_at: datetime
   updated_at: Optional[datetime] = None
 
-  class Config:
-      from_attributes = True
-
 
 class WorkflowCreateRequest(BaseModel):
     workflow_definition: WFWorkflowDefinition = Field(..., description="The complete definition of the workflow.")
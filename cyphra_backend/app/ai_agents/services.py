@@ -1,22 +1,29 @@
 import os
+import asyncio
 import httpx
-import json
 import logging
+import orjson
+import ormsgpack
 import requests
 import uuid
+from cachetools import TTLCache
 from redis.asyncio import Redis as AsyncRedis
-from typing import List, Dict, Any, Optional, Union
+from redis.asyncio.client import Pipeline
+from typing import AsyncIterator, List, Dict, Any, Optional, Union
 
 from fastapi import FastAPI, HTTPException, Depends, APIRouter, Body, BackgroundTasks
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session # Assuming you'll integrate SQLAlchemy session for some operations
-
-from app.core.database import get_session
+from sqlalchemy import Row, and_, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.ai_agents.schemas import (
     WorkflowDefinitionResponse,
+    WorkflowRunResponse,
 )
 from app.ai_agents.models import WorkflowDefinitionDB
-from app.core.redis import get_redis_pool, get_redis_connection
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
 from app.core.constants import DATASET_VERIFIER_WORKFLOW_ID, DATASET_VERIFIER_WORKFLOW_NAME_TEMPLATE
 
 try:
@@ -54,6 +61,11 @@ logger = logging.getLogger("MultiAgentAPI")
 
 
 WORKFLOW_DEFINITIONS_STORE: Dict[str, WFWorkflowDefinition] = {}
+
+
+def _dumps(obj: Any) -> str:
+    """orjson-backed json.dumps for tool results (LangChain tools must return str)."""
+    return orjson.dumps(obj).decode()
 # Initialize workflow app config
 WF_CONFIG = WFAppConfig()
 
@@ -78,31 +90,33 @@ class CampaignDataTool(WFBaseTool):
         if not requests: # Check if requests library is available
             logger.error("'requests' library is not installed. CampaignDataTool will not function.")
 
-    def _run(self, query_type: str, params: Dict[str, Any]) -> str:
-        if not requests: return json.dumps({"error": "'requests' library not installed."})
-        if not self.fastapi_base_url: return json.dumps({"error": "FastAPI base_url for campaign data not configured."})
-        logger.info(f"CampaignDataTool: query_type='{query_type}', params={params}")
-        # ... (implementation from previous version) ...
+    def _resolve_endpoint(self, query_type: str, params: Dict[str, Any]) -> tuple[Optional[str], Optional[str]]:
+        """Returns (endpoint, error) for a query; exactly one of them is set."""
         if query_type == "get_campaign_details_by_onchain_id":
             onchain_id = params.get("onchain_campaign_id")
-            if not onchain_id: return json.dumps({"error": "Missing 'onchain_campaign_id'."})
-            endpoint = f"{self.fastapi_base_url}/campaigns/{onchain_id}"
+            if not onchain_id: return None, "Missing 'onchain_campaign_id'."
+            return f"{self.fastapi_base_url}/campaigns/{onchain_id}", None
         elif query_type == "get_campaign_contributions":
             onchain_id = params.get("onchain_campaign_id")
-            if not onchain_id: return json.dumps({"error": "Missing 'onchain_campaign_id'."})
-            endpoint = f"{self.fastapi_base_url}/campaigns/get-contributions/{onchain_id}"
-        else:
-            return json.dumps({"error": f"Unsupported query_type: {query_type}"})
+            if not onchain_id: return None, "Missing 'onchain_campaign_id'."
+            return f"{self.fastapi_base_url}/campaigns/get-contributions/{onchain_id}", None
+        return None, f"Unsupported query_type: {query_type}"
+
+    def _run(self, query_type: str, params: Dict[str, Any]) -> str:
+        if not requests: return _dumps({"error": "'requests' library not installed."})
+        if not self.fastapi_base_url: return _dumps({"error": "FastAPI base_url for campaign data not configured."})
+        logger.info(f"CampaignDataTool: query_type='{query_type}', params={params}")
+        endpoint, error = self._resolve_endpoint(query_type, params)
+        if error: return _dumps({"error": error})
         try:
             response = requests.get(endpoint, timeout=10)
-            response.raise_for_status(); return json.dumps(response.json())
+            response.raise_for_status(); return _dumps(response.json())
         except Exception as e:
-            logger.error(f"CampaignDataTool API call to {endpoint} failed: {e}"); return json.dumps({"error": str(e)})
-    async def _arun(self, query_type: str, params: Dict[str, Any]) -> str: return self._run(query_type, params)
+            logger.error(f"CampaignDataTool API call to {endpoint} failed: {e}"); return _dumps({"error": str(e)})
 
     async def _arun(self, query_type: str, params: Dict[str, Any]) -> str:
-        # TODO: Use httpx for async requests in a real scenario
-        logger.warning("CampaignDataTool._arun is using synchronous requests.")
+        # Runs execute in a worker thread or under their own asyncio.run, so the app's shared client
+        # (bound to the server loop) can't be used here; stay on the sync path.
         return self._run(query_type, params)
 
 
@@ -116,73 +130,307 @@ class UpdateContributionVerificationTool(WFBaseTool):
         if not self.fastapi_base_url: logger.warning("FastAPI base_url not provided to UpdateContributionVerificationTool.")
         if not requests: logger.error("'requests' library not installed.")
     def _run(self, contribution_id: str, ai_verification_score: float, is_verified: bool) -> str:
-        if not requests: return json.dumps({"error": "'requests' library not installed."})
-        if not self.fastapi_base_url: return json.dumps({"error": "FastAPI base_url not configured."})
+        if not requests: return _dumps({"error": "'requests' library not installed."})
+        if not self.fastapi_base_url: return _dumps({"error": "FastAPI base_url not configured."})
         endpoint = f"{self.fastapi_base_url}/internal/contributions/{contribution_id}/verify" # Assumed internal endpoint
         payload = {"ai_verification_score": ai_verification_score, "is_verified": is_verified}
         logger.info(f"UpdateContributionVerificationTool: Calling {endpoint} with {payload}")
         # Actual call commented out, implement this endpoint in your campaign API
         logger.warning(f"UpdateContributionVerificationTool: Call to {endpoint} is mocked."); 
-        return json.dumps({"status": "success", "message": "Verification update mocked.", "contribution_id": contribution_id})
+        return _dumps({"status": "success", "message": "Verification update mocked.", "contribution_id": contribution_id})
     async def _arun(self, contribution_id: str, ai_verification_score: float, is_verified: bool) -> str: return self._run(contribution_id, ai_verification_score, is_verified)
 
 
 
-async def get_workflow_def_from_cache_or_db(workflow_id_api: str, db: Session, redis: AsyncRedis) -> Optional[WorkflowDefinitionResponse]:
-    cache_key = f"workflow_define:{workflow_id_api}"
-    cached_def_bytes = await redis.get(cache_key)
+WORKFLOW_DEF_CACHE_TTL_SECONDS = 3600
+WORKFLOW_DEF_LOCAL_CACHE_TTL_SECONDS = 60
+WORKFLOW_DEF_INVALIDATION_CHANNEL = "wf_invalidate"
+
+# Process-local copy in front of Redis; other workers are told to drop entries via pub/sub.
+_local_workflow_defs: TTLCache = TTLCache(maxsize=1024, ttl=WORKFLOW_DEF_LOCAL_CACHE_TTL_SECONDS)
+WORKFLOW_MANAGER_TTL_SECONDS = 300
+# Compiled managers keyed by workflow_id_api -> (definition fingerprint, manager).
+_workflow_managers: TTLCache = TTLCache(maxsize=256, ttl=WORKFLOW_MANAGER_TTL_SECONDS)
+# Check if a system-default verifier workflow exists by a known name or API ID (simplified ID generation).
+DATASET_VERIFIER_WORKFLOW_API_ID = DATASET_VERIFIER_WORKFLOW_NAME_TEMPLATE.lower().replace(" ", "_")
+_default_verifier_def: Optional[WorkflowDefinitionResponse] = None
+_default_verifier_lock = asyncio.Lock()
+# In-progress DB loads keyed by workflow_id_api (see get_workflow_def_from_cache_or_db).
+_inflight_workflow_def_loads: Dict[str, asyncio.Future] = {}
+# Tags our own invalidation messages so this process doesn't evict the entry it just wrote.
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+
+# Columns needed for a WorkflowDefinitionResponse; selecting them directly skips ORM instance/identity-map overhead.
+_WORKFLOW_DEF_COLUMNS = (
+    WorkflowDefinitionDB.workflow_id_api,
+    WorkflowDefinitionDB.name,
+    WorkflowDefinitionDB.wallet_address,
+    WorkflowDefinitionDB.definition,
+    WorkflowDefinitionDB.created_at,
+    WorkflowDefinitionDB.updated_at,
+)
+
+
+def _workflow_def_cache_key(workflow_id_api: str) -> str:
+    return f"workflow_define:{workflow_id_api}"
+
+
+def _serialize_workflow_def(db_workflow: Union[WorkflowDefinitionDB, Row]) -> Dict[str, Any]:
+    """Full WorkflowDefinitionResponse shape (payload + metadata) so cache hits never need the DB."""
+    return {
+        "workflow_id_api": db_workflow.workflow_id_api,
+        "name": db_workflow.name,
+        "wallet_address": db_workflow.wallet_address,
+        "definition_payload": db_workflow.definition,
+        "created_at": db_workflow.created_at.isoformat() if db_workflow.created_at else None,
+        "updated_at": db_workflow.updated_at.isoformat() if db_workflow.updated_at else None,
+    }
+
+
+def _publish_workflow_def_invalidation(workflow_id_api: str, redis: Union[AsyncRedis, Pipeline]):
+    """Queues (on a pipeline) or returns the awaitable PUBLISH telling other workers to drop their copies."""
+    return redis.publish(WORKFLOW_DEF_INVALIDATION_CHANNEL, f"{_PROCESS_TOKEN}:{workflow_id_api}")
+
+
+async def listen_for_workflow_def_invalidations(redis: AsyncRedis):
+    """Long-running task (started in the app lifespan) that evicts local entries changed by other workers."""
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(WORKFLOW_DEF_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                origin, _, workflow_id_api = message["data"].decode().partition(":")
+                if origin != _PROCESS_TOKEN:
+                    _evict_local_workflow_state(workflow_id_api)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Entries we may have missed expire on their own after WORKFLOW_DEF_LOCAL_CACHE_TTL_SECONDS.
+            logger.warning(f"Workflow definition invalidation listener failed: {e}. Resubscribing.")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.reset()
+
+
+async def get_workflow_def_from_cache_or_db(workflow_id_api: str, db: AsyncSession, redis: AsyncRedis) -> Optional[WorkflowDefinitionResponse]:
+    local_def = _local_workflow_defs.get(workflow_id_api)
+    if local_def is not None:
+        return local_def
+
+    cached_def_bytes = await redis.get(_workflow_def_cache_key(workflow_id_api))
     if cached_def_bytes:
         logger.info(f"Cache HIT for workflow definition: {workflow_id_api}")
-        cached_def_str = cached_def_bytes.decode('utf-8')
-        cached_def = json.loads(cached_def_str)
-        return WorkflowDefinitionResponse(
-            workflow_id_api=cached_def['workflow_id_api'],
-            name=cached_def['name'],
-            wallet_address=cached_def['wallet_address'],
-            definition_payload=WFWorkflowDefinition(**cached_def['definition']),
-            created_at=cached_def['created_at'],
-            updated_at=cached_def.get('updated_at')
-        )
+        workflow_def = WorkflowDefinitionResponse.model_validate(ormsgpack.unpackb(cached_def_bytes))
+        _local_workflow_defs[workflow_id_api] = workflow_def
+        return workflow_def
 
     logger.info(f"Cache MISS for workflow definition: {workflow_id_api}. Fetching from DB.")
-    db_workflow = db.query(WorkflowDefinitionDB).filter(WorkflowDefinitionDB.workflow_id_api == workflow_id_api).first()
+    # Single-flight: concurrent misses for the same id wait on the first request's DB load.
+    # No lock is needed around the dict: nothing awaits between the lookup and the insert.
+    inflight = _inflight_workflow_def_loads.get(workflow_id_api)
+    if inflight is not None:
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise # This request itself was cancelled
+            # The loading request went away before finishing; load it ourselves below.
+            return await _load_workflow_def_from_db(workflow_id_api, db, redis)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight_workflow_def_loads[workflow_id_api] = future
+    try:
+        workflow_def = await _load_workflow_def_from_db(workflow_id_api, db, redis)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception() # Mark retrieved so a miss with no waiters doesn't log "never retrieved"
+        raise
+    else:
+        future.set_result(workflow_def)
+        return workflow_def
+    finally:
+        _inflight_workflow_def_loads.pop(workflow_id_api, None)
+
+async def _load_workflow_def_from_db(workflow_id_api: str, db: AsyncSession, redis: AsyncRedis) -> Optional[WorkflowDefinitionResponse]:
+    db_workflow = (await db.execute(
+        select(*_WORKFLOW_DEF_COLUMNS).where(WorkflowDefinitionDB.workflow_id_api == workflow_id_api)
+    )).first()
     if db_workflow:
-        # Store the dictionary representation in cache
-        data = {
-            "workflow_id_api": db_workflow.workflow_id_api,
-            "name": db_workflow.name,
-            "wallet_address": db_workflow.wallet_address,
-            "definition": db_workflow.definition,
-            "created_at": str(db_workflow.created_at),
-            "updated_at": str(db_workflow.updated_at) if db_workflow.updated_at else None
-        }
-        print(f"Workflow definition from data: {data}")
-        await redis.set(cache_key, json.dumps(data), ex=3600)
-        return WorkflowDefinitionResponse(
-            workflow_id_api=data['workflow_id_api'],
-            name=data['name'],
-            wallet_address=data['wallet_address'],
-            definition_payload=WFWorkflowDefinition(**data['definition']),
-            created_at=data['created_at'],
-            updated_at=data['updated_at']
-        )
+        # NX: if a concurrent request already filled the key, keep its entry instead of rewriting it.
+        data = await cache_workflow_def(db_workflow, redis, only_if_absent=True)
+        return WorkflowDefinitionResponse.model_validate(data)
     return None
 
-async def cache_workflow_def(workflow_id_api: str, workflow_def: WFWorkflowDefinition, redis: AsyncRedis):
-    cache_key = f"workflow_define:{workflow_id_api}"
-    await redis.set(cache_key, json.dumps(workflow_def), ex=3600)
+async def cache_workflow_def(db_workflow: Union[WorkflowDefinitionDB, Row], redis: AsyncRedis, only_if_absent: bool = False) -> Dict[str, Any]:
+    """
+    Writes a definition to the local and Redis caches. Unless only_if_absent (a plain cache fill),
+    the write is a change, so other workers are told to drop their local copies.
+    """
+    data = _serialize_workflow_def(db_workflow)
+    async with redis.pipeline(transaction=False) as pipe:
+        # msgpack instead of JSON text: smaller entries and faster decoding on every cache hit.
+        pipe.set(_workflow_def_cache_key(db_workflow.workflow_id_api), ormsgpack.packb(data), ex=WORKFLOW_DEF_CACHE_TTL_SECONDS, nx=only_if_absent)
+        if not only_if_absent:
+            _publish_workflow_def_invalidation(db_workflow.workflow_id_api, pipe)
+        await pipe.execute()
+    _local_workflow_defs[db_workflow.workflow_id_api] = WorkflowDefinitionResponse.model_validate(data)
+    if not only_if_absent:
+        _evict_local_workflow_state(db_workflow.workflow_id_api, keep_definition=True)
+    return data
+
+
+WALLET_WORKFLOWS_PAGE_SIZE = 100
+
+
+async def stream_workflows_by_wallet(wallet_address: str, redis: AsyncRedis) -> AsyncIterator[bytes]:
+    """
+    Yields a JSON array of WorkflowDefinitionResponse objects for a wallet, newest first.
+
+    Rows are read in pages of WALLET_WORKFLOWS_PAGE_SIZE as plain column tuples (no ORM identity
+    map), keyset-paginated on (created_at DESC, workflow_id_api) so every page is a range scan of
+    ix_workflow_definitions_wallet_created. Each page is fetched in its own short-lived session:
+    the generator keeps running after the request dependencies are torn down, and a slow reader
+    must not hold a pooled connection while the response is being sent. Each page also warms the
+    per-id Redis cache in one pipelined round-trip.
+    """
+    first_page = (
+        select(*_WORKFLOW_DEF_COLUMNS)
+        .where(WorkflowDefinitionDB.wallet_address == wallet_address)
+        .order_by(WorkflowDefinitionDB.created_at.desc(), WorkflowDefinitionDB.workflow_id_api)
+        .limit(WALLET_WORKFLOWS_PAGE_SIZE)
+    )
+    stmt = first_page
+    separator = b"["
+    while True:
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(stmt)).all()
+        async with redis.pipeline(transaction=False) as pipe:
+            for row in rows:
+                data = _serialize_workflow_def(row)
+                # NX: never overwrite an entry written by a concurrent define/update.
+                pipe.set(_workflow_def_cache_key(row.workflow_id_api), ormsgpack.packb(data), ex=WORKFLOW_DEF_CACHE_TTL_SECONDS, nx=True)
+                yield separator + WorkflowDefinitionResponse.model_validate(data).model_dump_json().encode()
+                separator = b","
+            try:
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to warm workflow definition cache for wallet {wallet_address}: {e}")
+        if len(rows) < WALLET_WORKFLOWS_PAGE_SIZE:
+            break
+        last = rows[-1]
+        stmt = first_page.where(or_(
+            WorkflowDefinitionDB.created_at < last.created_at,
+            and_(WorkflowDefinitionDB.created_at == last.created_at, WorkflowDefinitionDB.workflow_id_api > last.workflow_id_api),
+        ))
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def dialect_insert(db: AsyncSession):
+    """Dialect-specific insert() so callers can use ON CONFLICT on both Postgres and SQLite."""
+    return sqlite_insert if db.bind.dialect.name == "sqlite" else pg_insert
 
 async def invalidate_workflow_def_cache(workflow_id_api: str, redis: AsyncRedis):
-    cache_key = f"workflow_define:{workflow_id_api}"
-    await redis.delete(cache_key)
+    _evict_local_workflow_state(workflow_id_api)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.delete(_workflow_def_cache_key(workflow_id_api))
+        _publish_workflow_def_invalidation(workflow_id_api, pipe)
+        await pipe.execute()
+
+
+def _workflow_definition_fingerprint(workflow_definition: WFWorkflowDefinition) -> int:
+    payload = workflow_definition.definition_payload
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump()
+    return hash(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS))
+
+
+def _evict_local_workflow_state(workflow_id_api: str, keep_definition: bool = False):
+    """Drops every in-process copy derived from a workflow definition that changed or was deleted."""
+    global _default_verifier_def
+    if not keep_definition:
+        _local_workflow_defs.pop(workflow_id_api, None)
+    _workflow_managers.pop(workflow_id_api, None)
+    if workflow_id_api == DATASET_VERIFIER_WORKFLOW_API_ID:
+        _default_verifier_def = None
 
 
 def get_workflow_manager_instance(workflow_definition: WFWorkflowDefinition) -> EnterpriseWorkflowManager:
-    """Instantiates EWM. Tool registry is handled within EWM based on app_config."""
-    return EnterpriseWorkflowManager(
+    """
+    Returns a compiled EWM for the definition, reusing the one built for the same workflow id and
+    definition content within WORKFLOW_MANAGER_TTL_SECONDS. Tool registry is handled within EWM based on app_config.
+    """
+    workflow_id_api = workflow_definition.workflow_id_api
+    fingerprint = _workflow_definition_fingerprint(workflow_definition)
+    cached = _workflow_managers.get(workflow_id_api)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    manager = EnterpriseWorkflowManager(
         workflow_definition=workflow_definition,
         app_config=WF_CONFIG,
-        persistence_db=":memory:" # LangGraph checkpointer, not workflow def storage
+        # No LangGraph checkpointer: the manager is shared by concurrent runs and thread_ids can come
+        # from the client, so a shared MemorySaver would let one run resume another's checkpoint.
+        # Runs never interrupt or resume, and results are kept in Redis (store_workflow_run_result).
+        persistence_db=None
+    )
+    _workflow_managers[workflow_id_api] = (fingerprint, manager)
+    return manager
+
+
+WORKFLOW_RUN_RESULT_TTL_SECONDS = 86400
+
+
+def _workflow_run_key(thread_id: str) -> str:
+    return f"workflow_run:{thread_id}"
+
+
+def _json_default(obj: Any) -> Any:
+    # Final states carry LangChain messages (pydantic models) alongside plain data.
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return str(obj)
+
+
+async def store_workflow_run_result(thread_id: str, status: str, redis: AsyncRedis, final_state: Optional[Dict[str, Any]] = None, message: Optional[str] = None):
+    run_result = {"thread_id": thread_id, "status": status, "message": message, "final_state": final_state}
+    await redis.set(_workflow_run_key(thread_id), orjson.dumps(run_result, default=_json_default), ex=WORKFLOW_RUN_RESULT_TTL_SECONDS)
+
+
+async def store_pending_workflow_runs(thread_ids: List[str], redis: AsyncRedis):
+    """Marks a batch of queued runs as PENDING in one pipelined round-trip."""
+    async with redis.pipeline(transaction=False) as pipe:
+        for thread_id in thread_ids:
+            run_result = {"thread_id": thread_id, "status": "PENDING", "message": None, "final_state": None}
+            pipe.set(_workflow_run_key(thread_id), orjson.dumps(run_result), ex=WORKFLOW_RUN_RESULT_TTL_SECONDS)
+        await pipe.execute()
+
+
+async def get_workflow_run_result(thread_id: str, redis: AsyncRedis) -> Optional[WorkflowRunResponse]:
+    run_result = await redis.get(_workflow_run_key(thread_id))
+    return WorkflowRunResponse(**orjson.loads(run_result)) if run_result else None
+
+
+async def run_workflow_and_store_result(manager: EnterpriseWorkflowManager, initial_input: Dict[str, Any], thread_id: str, redis: AsyncRedis):
+    """Background task: runs the workflow in a worker thread and records the outcome for /runs/{thread_id}."""
+    try:
+        final_state = await asyncio.to_thread(manager.run_workflow, initial_input, thread_id=thread_id)
+    except Exception as e:
+        logger.error(f"Error running workflow for thread_id='{thread_id}': {e}", exc_info=True)
+        await store_workflow_run_result(thread_id, "ERROR", redis, message=str(e))
+        return
+    logger.info(f"Workflow run completed for thread_id='{thread_id}'")
+    await store_workflow_run_result(
+        thread_id,
+        "COMPLETED" if "error" not in final_state else "ERROR",
+        redis,
+        final_state=final_state,
+        message=final_state.get("error")
     )
 
 
@@ -213,10 +461,28 @@ def get_workflow_manager(workflow_definition: WFWorkflowDefinition) -> Enterpris
     )
 
 
-async def get_or_create_dataset_verifier_workflow_def(db: Session, redis: AsyncRedis) -> WFWorkflowDefinition:
+async def get_or_create_dataset_verifier_workflow_def(db: AsyncSession, redis: AsyncRedis, use_local_cache: bool = True) -> WFWorkflowDefinition:
+    """
+    Memoized per process: after the first call, verification requests skip the cache/DB lookup entirely.
+    Processes that don't run listen_for_workflow_def_invalidations (Celery workers) pass
+    use_local_cache=False so an updated definition is read from Redis/DB on every call.
+    """
+    global _default_verifier_def
+    if not use_local_cache:
+        _local_workflow_defs.pop(DATASET_VERIFIER_WORKFLOW_API_ID, None)
+        return await _load_or_create_dataset_verifier_workflow_def(db, redis)
+    if _default_verifier_def is not None:
+        return _default_verifier_def
+    async with _default_verifier_lock:
+        if _default_verifier_def is None:
+            _default_verifier_def = await _load_or_create_dataset_verifier_workflow_def(db, redis)
+        return _default_verifier_def
+
+
+async def _load_or_create_dataset_verifier_workflow_def(db: AsyncSession, redis: AsyncRedis) -> WFWorkflowDefinition:
     # Check if a system-default verifier workflow exists by a known name or API ID
     # For simplicity, we use a fixed name. In production, this might have a specific flag or tag.
-    api_id_candidate = DATASET_VERIFIER_WORKFLOW_NAME_TEMPLATE.lower().replace(" ", "_") # simplified ID generation
+    api_id_candidate = DATASET_VERIFIER_WORKFLOW_API_ID
     
     existing_def = await get_workflow_def_from_cache_or_db(api_id_candidate, db, redis)
     if existing_def:
@@ -264,23 +530,40 @@ async def get_or_create_dataset_verifier_workflow_def(db: Session, redis: AsyncR
         ],
         "start_node_id": "fetch_contribution_data_step"
     }
-    # Save this default verifier workflow to DB and cache it
+    # Single round-trip create: ON CONFLICT DO NOTHING returns no row if another process won the race.
+    stmt = (
+        dialect_insert(db)(WorkflowDefinitionDB)
+        .values(
+            workflow_id_api=api_id_candidate, # Use the generated candidate ID
+            name=DATASET_VERIFIER_WORKFLOW_NAME_TEMPLATE,
+            wallet_address="system_default", # Indicates it's a system workflow
+            definition=verifier_workflow_payload
+        )
+        .on_conflict_do_nothing(index_elements=["workflow_id_api"])
+        .returning(WorkflowDefinitionDB.created_at, WorkflowDefinitionDB.updated_at)
+    )
+    try:
+        inserted = (await db.execute(stmt)).first()
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to save default verifier workflow: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Could not create or retrieve default verifier workflow.")
+
+    if inserted is None:
+        logger.info(f"Default verifier workflow '{api_id_candidate}' was created concurrently. Fetching it.")
+        existing_def = await get_workflow_def_from_cache_or_db(api_id_candidate, db, redis)
+        if existing_def: return existing_def
+        raise HTTPException(status_code=500, detail="Could not create or retrieve default verifier workflow.")
+
     db_workflow = WorkflowDefinitionDB(
-        workflow_id_api=api_id_candidate, # Use the generated candidate ID
+        workflow_id_api=api_id_candidate,
         name=DATASET_VERIFIER_WORKFLOW_NAME_TEMPLATE,
-        wallet_address="system_default", # Indicates it's a system workflow
-        definition=verifier_workflow_payload
+        wallet_address="system_default",
+        definition=verifier_workflow_payload,
+        created_at=inserted.created_at,
+        updated_at=inserted.updated_at
     )
-    db.add(db_workflow)
-    try:
-        db.commit(); db.refresh(db_workflow)
-        await cache_workflow_def(api_id_candidate, verifier_workflow_payload, redis)
-        logger.info(f"Created and cached system default verifier workflow: API_ID='{api_id_candidate}'")
-        return verifier_workflow_payload
-    except Exception as e: # Could be unique constraint violation if another process created it
-        db.rollback()
-        logger.warning(f"Failed to save default verifier workflow, might exist: {e}. Attempting to fetch again.")
-        # Try fetching again in case of race condition
-        refetched_def = await get_workflow_def_from_cache_or_db(api_id_candidate, db, redis)
-        if refetched_def: return refetched_def
-        raise HTTPException(status_code=500, detail="Could not create or retrieve default verifier workflow.")
\ No newline at end of file
+    data = await cache_workflow_def(db_workflow, redis)
+    logger.info(f"Created and cached system default verifier workflow: API_ID='{api_id_candidate}'")
+    return WorkflowDefinitionResponse.model_validate(data)
@@ -88,4 +88,5 @@ class AITrainingJob(Base):
     created_at = Column(DateTime(timezone=True), server_default=sql_func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=sql_func.now(), server_default=sql_func.now())
     started_at = Column(DateTime(timezone=True), nullable=True)
-    completed_at = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    __table_args__ = (Index("idx_aitj_platform_status", "platform", "status", postgresql_where=user_credential_id.isnot(None)),)
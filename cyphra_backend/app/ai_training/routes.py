@@ -23,7 +23,6 @@ import hashlib
 import httpx # For asynchronous HTTP requests in tools
 
 from app.ai_training.utils.security import fernet_cipher
-from app.core.redis import get_redis_ml_ops, get_redis_pool
 from app.core.database import get_session, get_session_with_ctx_manager
 from app.core.constants import MLOPS_ENCRYPTION_KEY, FASTAPI_BASE_URL_CAMPAIGN_API, HUGGING_FACE_HUB_TOKEN_MLOPS, AWS_ACCESS_KEY_ID_MLOPS, AWS_SECRET_ACCESS_KEY_MLOPS, AWS_REGION_MLOPS, WEBHOOK_SHARED_SECRET
 from app.ai_training.models import ProcessedDataset, UserExternalServiceCredential, TrainingPlatform, AITrainingJob
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, Index, true
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -35,6 +35,12 @@ class Campaign(Base):
     activities = relationship("Activity", back_populates="campaign")
     processed_datasets = relationship("ProcessedDataset", back_populates="campaign")
 
+    __table_args__ = (
+        # Only active campaigns are indexed, so the expiry sweep stays an index range scan
+        # however many inactive campaigns pile up.
+        Index("idx_campaign_active_exp", "expiration", postgresql_where=is_active == true(), sqlite_where=is_active == true()),
+    )
+
 
 class Contribution(Base):
     __tablename__ = 'contributions'
@@ -56,6 +62,16 @@ class Contribution(Base):
     campaign = relationship("Campaign", back_populates="contributions")
     activities = relationship("Activity", back_populates="contribution")
 
+    __table_args__ = (
+        # Serves per-campaign lookups (campaign_id alone is a prefix) and the
+        # campaign + onchain id lookup behind /walrus/download; the included columns
+        # let Postgres answer the download lookup with an index-only scan.
+        Index(
+            "ix_contribution_campaign_onchain", "campaign_id", "onchain_contribution_id",
+            postgresql_include=["data_url", "file_type"],
+        ),
+    )
+
 
 class Activity(Base):
     __tablename__ = 'activity'
@@ -1,15 +1,24 @@
+import asyncio
+import httpx
 import logging
+import os
 import requests
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
-from celery import Celery
+from celery import Celery, chord
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
-from huggingface_hub import model_info, space_info # For checking HF resources
-from huggingface_hub.utils import RepositoryNotFoundError, HfHubHTTPError # Specific exceptions
 
 # Assuming your project structure and necessary imports
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, AsyncSessionLocal, async_engine
 import app.ai_training.models as ai_models
 from app.core.enums.ai_training import JobStatus, TrainingPlatform, ModelStorageType
 
@@ -19,167 +28,363 @@ from app.campaigns.models import Campaign
 
 # Create a Celery app
 celery_app = Celery('tasks', broker=REDIS_URL)
+# Reuse pooled broker connections for publishing instead of reconnecting per .delay().
+celery_app.conf.update(
+    broker_pool_limit=10,
+    broker_connection_retry_on_startup=True,
+    broker_transport_options={'visibility_timeout': 3600, 'socket_keepalive': True},
+    result_backend=REDIS_URL,
+    result_backend_transport_options={'socket_keepalive': True},
+    # Network-bound HF status checks get their own queue so they can't starve other tasks.
+    task_routes={'app.celery.celery.check_hf_jobs_batch': {'queue': 'hf_checks'}},
+)
 logger = logging.getLogger(__name__)
 
 
 DEFAULT_JOB_TIMEOUT_SECONDS = 6 * 60 * 60  # Default to 6 hours, for example
+HF_CHECK_MAX_WORKERS = 32  # Concurrent HF API lookups per status-check run
+HF_CHECK_COMMIT_BATCH_SIZE = 50  # Jobs checked and committed per transaction
+_TERMINAL_JOB_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+# Positive IN over the non-terminal statuses (rather than NOT IN) so the planner can use idx_aitj_platform_status.
+_ACTIVE_JOB_STATUSES = tuple(status for status in JobStatus if status not in _TERMINAL_JOB_STATUSES)
+_ACTIVE_HF_JOB_FILTER = (
+    ai_models.AITrainingJob.platform == TrainingPlatform.HUGGING_FACE,
+    ai_models.AITrainingJob.user_credential_id.isnot(None),  # Ensure a credential is linked
+    ai_models.AITrainingJob.status.in_(_ACTIVE_JOB_STATUSES),
+)
+# Singleton lock for check_huggingface_job_statuses runs; released by compare-and-delete so a
+# run whose lock already expired can't free the lock of the run that replaced it.
+_redis = Redis.from_url(REDIS_URL)
+HF_STATUS_CHECK_LOCK_KEY = "celery:lock:hf_status_check"
+HF_STATUS_CHECK_LOCK_TTL_MS = 10 * 60 * 1000
+_release_lock_if_owner = _redis.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+)
+# Any of these in the target repo means training pushed its output. Adjust as needed.
+_EXPECTED_ARTIFACTS = frozenset(("adapter_model.safetensors", "adapter_config.json"))
+
+# Shared keep-alive HTTP/2 client for HF Hub status checks: one TLS handshake per worker
+# instead of one per model_info/space_info call. Connections open lazily, after the worker fork.
+_hf_client = httpx.Client(
+    base_url=os.getenv("HF_ENDPOINT", "https://huggingface.co"),
+    http2=True,
+    timeout=10.0,
+    headers={"User-Agent": "cyphra/1.0"},
+    limits=httpx.Limits(max_connections=HF_CHECK_MAX_WORKERS),
+)
+
+
+def _hf_get(path: str, token: str) -> dict:
+    response = _hf_client.get(path, headers={"Authorization": f"Bearer {token}"})
+    response.raise_for_status()
+    return response.json()
+
+
+def _hf_model_info(repo_id: str, token: str) -> dict:
+    """GET /api/models/{repo_id}; the 'siblings' list carries each file's 'rfilename'."""
+    return _hf_get(f"/api/models/{repo_id}", token)
+
+
+def _hf_space_runtime(repo_id: str, token: str) -> dict:
+    """GET /api/spaces/{repo_id}/runtime; 'stage' is e.g. RUNNING, BUILDING, ERRORED, SLEEPING."""
+    return _hf_get(f"/api/spaces/{repo_id}/runtime", token)
+
+
+def _is_hf_repo_not_found(e: Exception) -> bool:
+    # The Hub answers 401 rather than 404 for repos the token can't see, tagging them with X-Error-Code.
+    return isinstance(e, httpx.HTTPStatusError) and (
+        e.response.status_code == 404 or e.response.headers.get("X-Error-Code") == "RepoNotFound"
+    )
+
+
+def safe_call(fn, **kwargs):
+    """Calls fn(**kwargs) and returns (result, exc) so errors can be handled after a concurrent fan-out."""
+    try:
+        return fn(**kwargs), None
+    except Exception as e:
+        return None, e
+
+
+def _failed_job_update(job, reason: str, now: datetime) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "status": JobStatus.FAILED,
+        "error_message": (job.error_message or "") + reason,
+        "completed_at": now,
+        "updated_at": now,
+    }
+
+
+def _hf_job_status_update(job, target_model_repo_id, space_repo_id, model_result, space_result, now: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Decides a single job's new state from its (result, exc) model info / Space runtime lookups.
+    Returns the column changes as a bulk_update_mappings row, or None if the job is unchanged.
+    """
+    model_repo_populated = False
+    space_is_errored = False
+    space_is_stopped_or_sleeping = False
+    current_space_stage = "UNKNOWN" # Default
+    auth_failure = None
+
+    # 1. Target Model Repository
+    repo_details, e = model_result
+    if e is None:
+        siblings = repo_details.get("siblings") or []
+        model_repo_populated = any(file_info["rfilename"] in _EXPECTED_ARTIFACTS for file_info in siblings)
+        if model_repo_populated:
+            logger.info(f"Job {job.id}: Target model repo '{target_model_repo_id}' found and appears populated.")
+        else:
+            sibling_filenames = {file_info["rfilename"] for file_info in siblings}
+            logger.info(f"Job {job.id}: Target model repo '{target_model_repo_id}' found, but key artifacts missing. Files: {sibling_filenames}")
+    elif _is_hf_repo_not_found(e):
+        logger.info(f"Job {job.id}: Target model repo '{target_model_repo_id}' not found yet.")
+    elif isinstance(e, httpx.HTTPStatusError):
+        log_msg = f"Job {job.id}: HTTP error checking model repo '{target_model_repo_id}': {e.response.status_code}"
+        if hasattr(e.response, 'text'): log_msg += f" - {e.response.text}"
+        logger.error(log_msg)
+        if e.response.status_code == 401:
+            auth_failure = f"; HF API Error (Model Repo): Unauthorized access using token for credential ID {job.user_credential_id}."
+    else:
+        logger.error(f"Job {job.id}: Unexpected error checking model repo '{target_model_repo_id}': {e}", exc_info=e)
+
+    # 2. Space Status
+    if space_repo_id:
+        space_details, e = space_result
+        if e is None:
+            current_space_stage = space_details.get("stage") or current_space_stage
+            logger.info(f"Job {job.id}: Space '{space_repo_id}' current stage: {current_space_stage}")
+            if current_space_stage == 'ERRORED':
+                space_is_errored = True
+            elif current_space_stage in ['STOPPED', 'SLEEPING']:
+                space_is_stopped_or_sleeping = True
+        elif _is_hf_repo_not_found(e):
+            logger.warning(f"Job {job.id}: Space repo '{space_repo_id}' not found.")
+        elif isinstance(e, httpx.HTTPStatusError):
+            log_msg = f"Job {job.id}: HTTP error checking Space '{space_repo_id}': {e.response.status_code}"
+            if hasattr(e.response, 'text'): log_msg += f" - {e.response.text}"
+            logger.error(log_msg)
+            if e.response.status_code == 401:
+                auth_failure = (auth_failure or "") + f"; HF API Error (Space): Unauthorized access using token for credential ID {job.user_credential_id}."
+        else:
+            logger.error(f"Job {job.id}: Unexpected error checking Space '{space_repo_id}': {e}", exc_info=e)
+    else:
+        logger.warning(f"Job {job.id}: Space ID (external_job_id) not set. Cannot check Space runtime status.")
+
+    # 3. Decision Logic (Proceed only if the job hasn't been failed by API errors above)
+    if auth_failure:
+        return _failed_job_update(job, auth_failure, now)
+    if model_repo_populated:
+        logger.info(f"Job {job.id}: Model repo '{target_model_repo_id}' is populated. Marking job as COMPLETED.")
+        output_model_url = f"https://huggingface.co/{target_model_repo_id}"
+        return {
+            "id": job.id,
+            "status": JobStatus.COMPLETED,
+            "output_model_url": output_model_url,
+            "huggingface_model_url": output_model_url,
+            "output_model_storage_type": ModelStorageType.HUGGING_FACE,
+            "completed_at": now,
+            "error_message": None,
+            "updated_at": now,
+        }
+    if space_is_errored:
+        logger.info(f"Job {job.id}: Space '{space_repo_id}' is ERRORED. Marking job as FAILED.")
+        return _failed_job_update(job, f"; HF Space '{space_repo_id}' reported error stage: {current_space_stage}.", now)
+    if space_is_stopped_or_sleeping and not model_repo_populated:
+        logger.info(f"Job {job.id}: Space '{space_repo_id}' is {current_space_stage} but model repo '{target_model_repo_id}' not populated. Marking job as FAILED.")
+        return _failed_job_update(job, f"; HF Space '{space_repo_id}' is {current_space_stage} but output repo not populated.", now)
+
+    job_start_time = job.started_at or job.created_at
+    job_age_seconds = (now - job_start_time).total_seconds()
+    job_timeout_seconds = (job.training_script_config or {}).get("hf_space_job_timeout_seconds", DEFAULT_JOB_TIMEOUT_SECONDS)
+
+    if job_age_seconds > job_timeout_seconds:
+        logger.warning(f"Job {job.id}: Timed out ({job_age_seconds / 3600:.2f} hrs > {job_timeout_seconds / 3600:.2f} hrs). Marking FAILED.")
+        return _failed_job_update(job, f"; Job timed out after {job_timeout_seconds / 3600:.2f} hours.", now)
+
+    logger.info(f"Job {job.id}: No definitive status change. Current status: {job.status.value}. Space stage: {current_space_stage}.")
+    return None
+
+
+def _check_hf_jobs_batch(db: Session, jobs, now: datetime):
+    """
+    Checks one batch of HF jobs: the HF API lookups (model info / Space runtime) are fanned out
+    over a thread pool, then the resulting changes are written with a single bulk_update_mappings
+    (one executemany, no per-instance change tracking). The loaded jobs are only read, never mutated.
+    """
+    changed = []
+
+    # 1. Preflight: resolve token and repo IDs, failing misconfigured jobs up front.
+    checkable_jobs = []  # (job, hf_user_token, target_model_repo_id, space_repo_id)
+    token_cache: Dict[str, Optional[str]] = {}  # Decrypt each credential once per batch
+    for job in jobs:
+        logger.info(f"Checking status for HF job ID: {job.id}, Name: {job.job_name}, Current Status: {job.status.value}")
+
+        # With the .isnot(None) filter and eager loading, job.user_credential should exist.
+        # The main remaining failure point for the token is decryption.
+        if job.user_credential_id not in token_cache:
+            token_cache[job.user_credential_id] = job.user_credential.secret_key # Access the hybrid property (Fernet decrypt)
+        hf_user_token = token_cache[job.user_credential_id]
+
+        if not hf_user_token:
+            logger.warning(f"Job {job.id}: HF token could not be retrieved (likely decryption issue or key not set). Marking as FAILED.")
+            changed.append(_failed_job_update(job, "; Status Check Failed: Unable to retrieve/decrypt HF token.", now))
+            continue
+
+        target_model_repo_id = (job.training_script_config or {}).get("hf_target_model_repo_id")
+        space_repo_id = job.external_job_id
+
+        if not target_model_repo_id:
+            logger.warning(f"Job {job.id}: Target model repo ID (hf_target_model_repo_id) not configured. Marking as FAILED.")
+            changed.append(_failed_job_update(job, "; Misconfiguration: hf_target_model_repo_id missing.", now))
+            continue
+
+        checkable_jobs.append((job, hf_user_token, target_model_repo_id, space_repo_id))
+
+    # 2. Fan out the HF API calls. Jobs sharing a (repo_id, credential) pair share one lookup;
+    #    results are keyed by that pair as (result, exc) and only live for this batch.
+    model_results = {}
+    space_results = {}
+    if checkable_jobs:
+        with ThreadPoolExecutor(max_workers=HF_CHECK_MAX_WORKERS) as ex:
+            model_futures = {}
+            space_futures = {}
+            for job, hf_user_token, target_model_repo_id, space_repo_id in checkable_jobs:
+                model_key = (target_model_repo_id, job.user_credential_id)
+                if model_key not in model_futures:
+                    model_futures[model_key] = ex.submit(safe_call, _hf_model_info, repo_id=target_model_repo_id, token=hf_user_token)
+                space_key = (space_repo_id, job.user_credential_id)
+                if space_repo_id and space_key not in space_futures:
+                    space_futures[space_key] = ex.submit(safe_call, _hf_space_runtime, repo_id=space_repo_id, token=hf_user_token)
+            model_results = {key: future.result() for key, future in model_futures.items()}
+            space_results = {key: future.result() for key, future in space_futures.items()}
+
+    # 3. Decide each job's new state; one bad job is logged and skipped, not fatal to the batch.
+    for job, _, target_model_repo_id, space_repo_id in checkable_jobs:
+        try:
+            update = _hf_job_status_update(
+                job, target_model_repo_id, space_repo_id,
+                model_results[(target_model_repo_id, job.user_credential_id)],
+                space_results.get((space_repo_id, job.user_credential_id)),
+                now,
+            )
+        except Exception as e:
+            logger.error(f"Job {job.id}: Failed to evaluate status check results: {e}", exc_info=True)
+            continue
+        if update:
+            changed.append(update)
+
+    if changed:
+        db.bulk_update_mappings(ai_models.AITrainingJob, changed)
+
+
+@celery_app.task(name="app.celery.celery.check_hf_jobs_batch")
+def check_hf_jobs_batch(job_ids: List[int]):
+    """
+    Checks and commits one batch of Hugging Face training jobs. Batches run as independent
+    tasks, so a slow or failing batch doesn't hold up or roll back the others.
+    """
+    db: Session = SessionLocal()
+    now = datetime.now(timezone.utc)  # One timestamp for every update made in this batch
+    try:
+        jobs = db.execute(
+            select(ai_models.AITrainingJob).options(
+                selectinload(ai_models.AITrainingJob.user_credential)  # Eagerly load user_credential
+            ).filter(
+                ai_models.AITrainingJob.id.in_(job_ids),
+                *_ACTIVE_HF_JOB_FILTER,  # Skip jobs that finished after the batch was dispatched
+            )
+        ).scalars().all()
+        _check_hf_jobs_batch(db, jobs, now)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Critical error checking Hugging Face job batch {job_ids}: {e}", exc_info=True)
+        db.rollback()
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.celery.celery.release_hf_status_check_lock")
+def release_hf_status_check_lock(lock_token: str):
+    """Chord callback: frees the status-check lock once every batch of a run has finished."""
+    _release_lock_if_owner(keys=[HF_STATUS_CHECK_LOCK_KEY], args=[lock_token])
+
 
 @celery_app.task(name="app.celery.celery.check_huggingface_job_statuses") # Use a unique name
 def check_huggingface_job_statuses():
     """
     Periodically checks the status of active Hugging Face training jobs
     and updates their status in the database.
+
+    This is only the dispatcher: it splits the active job IDs into batches of
+    HF_CHECK_COMMIT_BATCH_SIZE and fans them out as check_hf_jobs_batch tasks on the
+    hf_checks queue, so they run in parallel across workers. A Redis lock held until the
+    last batch finishes (or HF_STATUS_CHECK_LOCK_TTL_MS passes) makes overlapping beat
+    runs skip instead of checking the same jobs twice.
     """
-    db: Session = SessionLocal()
+    lock_token = uuid.uuid4().hex
+    if not _redis.set(HF_STATUS_CHECK_LOCK_KEY, lock_token, nx=True, px=HF_STATUS_CHECK_LOCK_TTL_MS):
+        logger.info("Previous Hugging Face job status check still in progress, skipping.")
+        return
+
+    dispatched = False
     try:
-        active_hf_jobs = db.query(ai_models.AITrainingJob).options(
-            selectinload(ai_models.AITrainingJob.user_credential)  # Eagerly load user_credential
-        ).filter(
-            ai_models.AITrainingJob.platform == TrainingPlatform.HUGGING_FACE,
-            ai_models.AITrainingJob.user_credential_id.isnot(None),  # Ensure a credential is linked
-            ai_models.AITrainingJob.status.notin_([
-                JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED
-            ])
-        ).all()
-
-        if not active_hf_jobs:
+        db: Session = SessionLocal()
+        try:
+            active_job_ids = db.execute(
+                select(ai_models.AITrainingJob.id).filter(*_ACTIVE_HF_JOB_FILTER)
+            ).scalars().all()
+        finally:
+            db.close()
+
+        if not active_job_ids:
             logger.info("No active Hugging Face jobs with credentials to check.")
             return
 
-        logger.info(f"Found {len(active_hf_jobs)} active Hugging Face jobs to check.")
-
-        for job in active_hf_jobs:
-            logger.info(f"Checking status for HF job ID: {job.id}, Name: {job.job_name}, Current Status: {job.status.value}")
-
-            # With the .isnot(None) filter and eager loading, job.user_credential should exist.
-            # The main remaining failure point for the token is decryption.
-            hf_user_token = job.user_credential.secret_key # Access the hybrid property
-
-            if not hf_user_token:
-                logger.warning(f"Job {job.id}: HF token could not be retrieved (likely decryption issue or key not set). Marking as FAILED.")
-                job.status = JobStatus.FAILED
-                job.error_message = (job.error_message or "") + "; Status Check Failed: Unable to retrieve/decrypt HF token."
-                job.completed_at = datetime.now(timezone.utc)
-                job.updated_at = datetime.now(timezone.utc)
-                continue
-
-            target_model_repo_id = (job.training_script_config or {}).get("hf_target_model_repo_id")
-            space_repo_id = job.external_job_id
-
-            if not target_model_repo_id:
-                logger.warning(f"Job {job.id}: Target model repo ID (hf_target_model_repo_id) not configured. Marking as FAILED.")
-                job.status = JobStatus.FAILED
-                job.error_message = (job.error_message or "") + "; Misconfiguration: hf_target_model_repo_id missing."
-                job.completed_at = datetime.now(timezone.utc)
-                job.updated_at = datetime.now(timezone.utc)
-                continue
-
-            model_repo_populated = False
-            space_is_errored = False
-            space_is_stopped_or_sleeping = False
-            current_space_stage = "UNKNOWN" # Default
-
-            # 1. Check Target Model Repository
-            try:
-                logger.info(f"Job {job.id}: Checking model repo '{target_model_repo_id}' with user token.")
-                repo_details = model_info(repo_id=target_model_repo_id, token=hf_user_token)
-                expected_artifacts = ["adapter_model.safetensors", "adapter_config.json"] # Adjust as needed
-                sibling_filenames = {file_info.rfilename for file_info in repo_details.siblings}
-                
-                if any(artifact in sibling_filenames for artifact in expected_artifacts):
-                    model_repo_populated = True
-                    logger.info(f"Job {job.id}: Target model repo '{target_model_repo_id}' found and appears populated.")
-                else:
-                    logger.info(f"Job {job.id}: Target model repo '{target_model_repo_id}' found, but key artifacts missing. Files: {sibling_filenames}")
-            except RepositoryNotFoundError:
-                logger.info(f"Job {job.id}: Target model repo '{target_model_repo_id}' not found yet.")
-            except HfHubHTTPError as e:
-                log_msg = f"Job {job.id}: HTTP error checking model repo '{target_model_repo_id}': {e.response.status_code}"
-                if hasattr(e.response, 'text'): log_msg += f" - {e.response.text}"
-                logger.error(log_msg)
-                if e.response.status_code == 401:
-                    job.status = JobStatus.FAILED
-                    job.error_message = (job.error_message or "") + f"; HF API Error (Model Repo): Unauthorized access using token for credential ID {job.user_credential_id}."
-                    job.completed_at = datetime.now(timezone.utc)
-            except Exception as e:
-                logger.error(f"Job {job.id}: Unexpected error checking model repo '{target_model_repo_id}': {e}", exc_info=True)
-
-            # 2. Check Space Status
-            if space_repo_id:
-                try:
-                    logger.info(f"Job {job.id}: Checking Space '{space_repo_id}' status with user token.")
-                    space_details = space_info(repo_id=space_repo_id, token=hf_user_token)
-                    if space_details.runtime:
-                        current_space_stage = space_details.runtime.stage
-                    logger.info(f"Job {job.id}: Space '{space_repo_id}' current stage: {current_space_stage}")
-                    if current_space_stage == 'ERRORED':
-                        space_is_errored = True
-                    elif current_space_stage in ['STOPPED', 'SLEEPING']:
-                        space_is_stopped_or_sleeping = True
-                except RepositoryNotFoundError:
-                    logger.warning(f"Job {job.id}: Space repo '{space_repo_id}' not found.")
-                except HfHubHTTPError as e:
-                    log_msg = f"Job {job.id}: HTTP error checking Space '{space_repo_id}': {e.response.status_code}"
-                    if hasattr(e.response, 'text'): log_msg += f" - {e.response.text}"
-                    logger.error(log_msg)
-                    if e.response.status_code == 401:
-                        job.status = JobStatus.FAILED
-                        job.error_message = (job.error_message or "") + f"; HF API Error (Space): Unauthorized access using token for credential ID {job.user_credential_id}."
-                        job.completed_at = datetime.now(timezone.utc)
-                except Exception as e:
-                    logger.error(f"Job {job.id}: Unexpected error checking Space '{space_repo_id}': {e}", exc_info=True)
-            else:
-                logger.warning(f"Job {job.id}: Space ID (external_job_id) not set. Cannot check Space runtime status.")
-
-
-            # 3. Decision Logic (Proceed only if job status hasn't been set to FAILED by API errors above)
-            job_updated_this_cycle = False
-            if job.status not in [JobStatus.FAILED]: # Check if already marked FAILED due to auth error etc.
-                if model_repo_populated:
-                    logger.info(f"Job {job.id}: Model repo '{target_model_repo_id}' is populated. Marking job as COMPLETED.")
-                    job.status = JobStatus.COMPLETED
-                    job.output_model_url = f"https://huggingface.co/{target_model_repo_id}"
-                    job.huggingface_model_url = job.output_model_url
-                    job.output_model_storage_type = ModelStorageType.HUGGING_FACE
-                    job.completed_at = datetime.now(timezone.utc)
-                    job.error_message = None
-                    job_updated_this_cycle = True
-                elif space_is_errored:
-                    logger.info(f"Job {job.id}: Space '{space_repo_id}' is ERRORED. Marking job as FAILED.")
-                    job.status = JobStatus.FAILED
-                    job.error_message = (job.error_message or "") + f"; HF Space '{space_repo_id}' reported error stage: {current_space_stage}."
-                    job.completed_at = datetime.now(timezone.utc)
-                    job_updated_this_cycle = True
-                elif space_is_stopped_or_sleeping and not model_repo_populated:
-                    logger.info(f"Job {job.id}: Space '{space_repo_id}' is {current_space_stage} but model repo '{target_model_repo_id}' not populated. Marking job as FAILED.")
-                    job.status = JobStatus.FAILED
-                    job.error_message = (job.error_message or "") + f"; HF Space '{space_repo_id}' is {current_space_stage} but output repo not populated."
-                    job.completed_at = datetime.now(timezone.utc)
-                    job_updated_this_cycle = True
-                else:
-                    job_start_time = job.started_at or job.created_at
-                    job_age_seconds = (datetime.now(timezone.utc) - job_start_time).total_seconds()
-                    job_timeout_seconds = (job.training_script_config or {}).get("hf_space_job_timeout_seconds", DEFAULT_JOB_TIMEOUT_SECONDS)
-
-                    if job_age_seconds > job_timeout_seconds:
-                        logger.warning(f"Job {job.id}: Timed out ({job_age_seconds / 3600:.2f} hrs > {job_timeout_seconds / 3600:.2f} hrs). Marking FAILED.")
-                        job.status = JobStatus.FAILED
-                        job.error_message = (job.error_message or "") + f"; Job timed out after {job_timeout_seconds / 3600:.2f} hours."
-                        job.completed_at = datetime.now(timezone.utc)
-                        job_updated_this_cycle = True
-                    else:
-                        logger.info(f"Job {job.id}: No definitive status change. Current status: {job.status.value}. Space stage: {current_space_stage}.")
-            
-            if job_updated_this_cycle or job.status == JobStatus.FAILED: # Ensure updated_at is set if any change or failure determination
-                job.updated_at = datetime.now(timezone.utc)
+        logger.info(f"Found {len(active_job_ids)} active Hugging Face jobs to check.")
+        chord(
+            check_hf_jobs_batch.s(active_job_ids[i:i + HF_CHECK_COMMIT_BATCH_SIZE])
+            for i in range(0, len(active_job_ids), HF_CHECK_COMMIT_BATCH_SIZE)
+        )(release_hf_status_check_lock.si(lock_token))
+        dispatched = True
+    finally:
+        if not dispatched:
+            _release_lock_if_owner(keys=[HF_STATUS_CHECK_LOCK_KEY], args=[lock_token])
 
-        db.commit()
-        logger.info("Finished checking all active Hugging Face job statuses.")
-    except Exception as e:
-        logger.error(f"Critical error in Celery task check_huggingface_job_statuses: {e}", exc_info=True)
-        db.rollback() # Rollback any partial changes from the loop if a broad error occurs
+
+async def _run_verification_workflow(contribution_id: str, onchain_campaign_id: str, data_url, thread_id: str):
+    # Imported here so beat and the other tasks don't pay for loading the workflow stack.
+    from app.ai_agents.services import (
+        get_or_create_dataset_verifier_workflow_def,
+        get_workflow_manager_instance,
+        run_workflow_and_store_result,
+    )
+
+    redis = AsyncRedis.from_url(REDIS_URL)
+    try:
+        async with AsyncSessionLocal() as db:
+            # Workers don't subscribe to workflow definition invalidations, so skip the process-local
+            # copies; the compiled manager is still reused while the definition is unchanged.
+            verifier_workflow_def = await get_or_create_dataset_verifier_workflow_def(db, redis, use_local_cache=False)
+        manager = get_workflow_manager_instance(verifier_workflow_def)
+        initial_input = {
+            "task_description": f"Verify contribution ID '{contribution_id}'. Data URL: '{data_url}'.",
+            "initial_scratchpad": {"contribution_id": contribution_id, "onchain_campaign_id": onchain_campaign_id, "data_url_input": data_url},
+        }
+        await run_workflow_and_store_result(manager, initial_input, thread_id, redis)
     finally:
-        db.close()
+        await redis.aclose()
+        # Each task runs in a fresh event loop; pooled asyncpg connections can't outlive it.
+        await async_engine.dispose()
+
+
+@celery_app.task(name="app.celery.celery.run_verification_workflow")
+def run_verification_workflow(contribution_id: str, onchain_campaign_id: str, data_url, thread_id: str):
+    """
+    Runs the dataset verifier workflow for one contribution. The outcome is stored in Redis
+    and can be polled at /agent-workflows/runs/{thread_id}.
+    """
+    asyncio.run(_run_verification_workflow(contribution_id, onchain_campaign_id, data_url, thread_id))
+
 
 # Defining the task that will call the endpoint
 @celery_app.task
@@ -190,18 +395,15 @@ def mark_expired_campaigns_inactive():
     db = SessionLocal()
     try:
         now = int(time.time())
-        # Query for campaigns that are still active but have passed their expiration date.
-        expired_campaigns = db.query(Campaign).filter(
+        # Deactivate every campaign that is still active but has passed its expiration date
+        # in a single UPDATE; no rows are loaded into the session.
+        updated = db.query(Campaign).filter(
             Campaign.expiration < now,
             Campaign.is_active == True
-        ).all()
-
-        # Mark each campaign as inactive.
-        for campaign in expired_campaigns:
-            campaign.is_active = False
+        ).update({Campaign.is_active: False}, synchronize_session=False)
 
         db.commit()
-        print(f"Marked {len(expired_campaigns)} campaigns as inactive.")
+        print(f"Marked {updated} campaigns as inactive.")
     except Exception as e:
         db.rollback()
         print(f"Error marking expired campaigns as inactive: {e}")
@@ -209,14 +411,22 @@ def mark_expired_campaigns_inactive():
         db.close()
 
 
+# Keep-alive session shared by every renew_subscriptions run in this worker.
+_http = requests.Session()
+_http.headers.update({
+    'X-API-Key': API_KEY,
+    'Content-Type': 'application/json'
+})
+_http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.5))
+_http.mount("https://", _http_adapter)
+_http.mount("http://", _http_adapter)
+RENEW_SUBSCRIPTIONS_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+
 @celery_app.task
 def renew_subscriptions():
     try:
-        headers = {
-            'X-API-Key': API_KEY,
-            'Content-Type': 'application/json'
-        }
-        response = requests.post(url=BASE_URL, headers=headers)
+        response = _http.post(url=BASE_URL, timeout=RENEW_SUBSCRIPTIONS_TIMEOUT)
         response.raise_for_status()  # Check for successful response
         print("process renewed successfully")
     except requests.exceptions.RequestException as e:
@@ -235,6 +445,6 @@ celery_app.conf.beat_schedule = {
     },
     'check-huggingface-job-statuses-every-10-minutes': {
         'task': 'app.celery.celery.check_huggingface_job_statuses',
-        'schedule': 2 * 60,  # Every 10 minutes (adjust as needed)
+        'schedule': 2 * 60,  # Every 2 minutes; overlapping runs skip via HF_STATUS_CHECK_LOCK_KEY
     },
 }
\ No newline at end of file
@@ -28,6 +28,12 @@ HUGGING_FACE_HUB_TOKEN_MLOPS = os.getenv("HUGGING_FACE_HUB_TOKEN_MLOPS", "")
 # AGGREGATOR_URL = "https://walrus.bnshub.org/aggregator/"
 PUBLISHER_URL = "https://publisher.walrus-testnet.walrus.space"
 AGGREGATOR_URL = "https://aggregator.walrus-testnet.walrus.space"
+# Blobs served to clients through nginx X-Accel-Redirect (see nginx/walrus_download.conf).
+# Only enable when the API is reachable solely through that nginx config.
+WALRUS_X_ACCEL_ENABLED = os.getenv("WALRUS_X_ACCEL_ENABLED", "false").lower() in ("1", "true", "yes")
+WALRUS_DOWNLOAD_CACHE_DIR = os.getenv("WALRUS_DOWNLOAD_CACHE_DIR", "/var/cache/walrus_dl")
+WALRUS_DOWNLOAD_CACHE_TTL_SECONDS = int(os.getenv("WALRUS_DOWNLOAD_CACHE_TTL_SECONDS", "3600"))  # Evict after this long unused
+WALRUS_X_ACCEL_PREFIX = "/_walrus_internal/"
 # PUBLISHER_URL = "https://walrus-publisher.rubynodes.io"
 # AGGREGATOR_URL = "https://walrus-aggregator.rubynodes.io"
 # AGGREGATOR_URL = "http://44.211.230.232:8080"
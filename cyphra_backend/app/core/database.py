@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import Session
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from contextlib import contextmanager
 
 from app.core.constants import SQLALCHEMY_DATABASE_URL
@@ -14,17 +15,50 @@ Base = declarative_base()
 
 logging.basicConfig()
 # logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_size=10,  # Adjust based on your app's concurrency requirements
-    max_overflow=5,  # Allows for extra connections in times of high demand
-    pool_timeout=120,  # Reduces wait time for a connection
-    pool_recycle=36000,  # Recycles connections every 1 hours
-    # echo_pool='debug',  # Logs pool checkouts/checkins (remove in production)
-    pool_pre_ping=True,
-    # Any idle transaction request past 20seconds will be terminated
-    # connect_args={"options": "-c idle_in_transaction_session_timeout=20000"},
-)
+if "sqlite" in SQLALCHEMY_DATABASE_URL:
+    # SQLite has no server-side connection limits; keep SQLAlchemy's default pool.
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+else:
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=20,  # Steady-state connections kept open for concurrent requests
+        max_overflow=20,  # Extra connections allowed during bursts
+        pool_timeout=30,  # Fail fast instead of queueing requests for minutes
+        pool_recycle=3600,  # Recycles connections every hour
+        # echo_pool='debug',  # Logs pool checkouts/checkins (remove in production)
+        pool_pre_ping=True,  # Drops dead connections before handing them out
+        # Any idle transaction request past 20seconds will be terminated
+        # connect_args={"options": "-c idle_in_transaction_session_timeout=20000"},
+    )
+
+
+def _to_async_database_url(url: str) -> str:
+    """Maps a sync driver URL onto its asyncio driver (asyncpg / aiosqlite)."""
+    for sync_prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("sqlite:///", "sqlite+aiosqlite:///"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+ASYNC_SQLALCHEMY_DATABASE_URL = _to_async_database_url(SQLALCHEMY_DATABASE_URL)
+
+if "sqlite" in ASYNC_SQLALCHEMY_DATABASE_URL:
+    async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+else:
+    async_engine = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        pool_size=20,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_recycle=3600,
+        pool_pre_ping=True,
+    )
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 
 def get_session():
@@ -43,6 +77,12 @@ def get_db():
         db.close()
 
 
+async def get_async_session():
+    """Async counterpart of get_session for handlers that must not block the event loop."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
 @contextmanager
 def get_session_with_ctx_manager():
     session = SessionLocal()
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SealPolicyType(str, Enum):
+    SUBSCRIPTION = "subscription"
+    ALLOWLIST = "allowlist"
+    TIMELOCK = "timelock"
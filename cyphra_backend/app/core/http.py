@@ -0,0 +1,16 @@
+import httpx
+from fastapi import Request
+
+
+HTTP_TIMEOUT_SECONDS = 15
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Builds the process-wide pooled HTTP/2 client (owned by the app lifespan)."""
+    return httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS, http2=True, limits=HTTP_LIMITS)
+
+
+async def get_http_client(request: Request) -> httpx.AsyncClient:
+    """FastAPI dependency returning the shared client stored on app.state."""
+    return request.app.state.http
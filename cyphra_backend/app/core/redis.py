@@ -1,42 +1,20 @@
-from contextlib import asynccontextmanager
-
-# import aioredis
-from redis.asyncio import Redis as AsyncRedis
-# from aioredis import Redis as AsyncRedis
-from typing import Optional
+from fastapi import Request
+from redis.asyncio import ConnectionPool, Redis as AsyncRedis
 
 from app.core.constants import REDIS_URL
 
 
-redis_client_ml_ops: Optional[AsyncRedis] = None
-
-async def get_redis_ml_ops() -> AsyncRedis:
-    global redis_client_ml_ops
-    if redis_client_ml_ops is None:
-        redis_client_ml_ops = await get_redis_pool()
-    return redis_client_ml_ops
-
-
-async def get_redis_pool() -> AsyncRedis:
-    pool = AsyncRedis.from_url(REDIS_URL, max_connections=40)
-    print("connection redis: ", pool)
-    return pool
+REDIS_MAX_CONNECTIONS = 40
 
 
-async def get_redis_connection():
-    pool = await get_redis_pool()  # Acquire the connection pool
-    async with pool as conn:  # Acquire a connection from the pool
-        yield conn
+def create_redis_pool() -> ConnectionPool:
+    """Builds the process-wide Redis connection pool (owned by the app lifespan).
 
+    Responses are left as bytes: cache values are binary (msgpack) and decoded by the caller.
+    """
+    return ConnectionPool.from_url(REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS)
 
-@asynccontextmanager
-async def get_redis_session(redis_pool: AsyncRedis):
-    # Get a connection from the pool
-    redis = await redis_pool.acquire()
 
-    try:
-        # Yield the connection for use in the with block
-        yield redis
-    finally:
-        # Release the connection back to the pool
-        redis_pool.release(redis)
+async def get_redis(request: Request) -> AsyncRedis:
+    """FastAPI dependency returning a client bound to the shared pool on app.state."""
+    return AsyncRedis(connection_pool=request.app.state.redis_pool)
@@ -1,21 +1,64 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
+
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from scalar_fastapi import get_scalar_api_reference
 
 from app.campaigns.routes import router as campaigns_router
 from app.ai_agents.routes import multi_agent_router
+from app.ai_agents.services import listen_for_workflow_def_invalidations
 from app.ai_training.routes import ml_ops_router
-from app.storage.routes import router as storage_router
+from app.storage.routes import router as storage_router, run_download_cache_pruner
 from app.ai_verification.routes import router as ai_verification_router
+from app.core.redis import create_redis_pool
+from redis.asyncio import Redis as AsyncRedis
+from app.core.http import create_http_client
+from app.storage.walrus import create_walrus_client
+from app.core.config import get_all_config
+from app.core.constants import WALRUS_X_ACCEL_ENABLED
 
 # Cyphra integrations
 from app.walrus.routes import router as walrus_router
 from app.seal.routes import router as seal_router
-from app.nautilus.routes import router as nautilus_router
+from app.seal.service import create_seal_service
+from app.nautilus.routes import router as nautilus_router, get_nautilus_service
+
+
+# Worker threads for blocking work: sync endpoints (anyio) and asyncio.to_thread (e.g. agent workflow runs).
+THREADPOOL_SIZE = 50
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=THREADPOOL_SIZE))
+    get_all_config()  # Warm the per-process config caches before the first request
+    app.state.redis_pool = create_redis_pool()
+    app.state.http = create_http_client()
+    app.state.walrus = create_walrus_client()
+    app.state.seal_service = create_seal_service()
+    await app.state.seal_service.warm()
+    workflow_def_listener = asyncio.create_task(
+        listen_for_workflow_def_invalidations(AsyncRedis(connection_pool=app.state.redis_pool))
+    )
+    download_cache_pruner = asyncio.create_task(run_download_cache_pruner()) if WALRUS_X_ACCEL_ENABLED else None
+    yield
+    workflow_def_listener.cancel()
+    if download_cache_pruner is not None:
+        download_cache_pruner.cancel()
+    await app.state.http.aclose()
+    await app.state.walrus.close()
+    await get_nautilus_service().close()
+    await app.state.seal_service.close()
+    await app.state.redis_pool.disconnect()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 @app.get("/scalar", include_in_schema=False)
 async def scalar_html():
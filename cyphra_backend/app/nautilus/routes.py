@@ -3,16 +3,21 @@ Nautilus API Routes for Cyphra
 Handles HTTP endpoints for verifiable computation
 """
 
+import base64
 import logging
+import uuid
+from functools import lru_cache
 from typing import List, Dict, Any
 from fastapi import APIRouter, HTTPException, Depends, Form, BackgroundTasks
-from sqlalchemy.orm import Session
+import redis.asyncio as aioredis
 
-from app.core.database import get_session
-from app.nautilus.service import NautilusService
+from app.core.config import get_nautilus_config
+from app.core.redis import get_redis
+from app.nautilus.service import NautilusService, store_training_job, get_training_job
 from app.nautilus.schemas import (
     NautilusVerificationResponse,
     NautilusTrainingResponse,
+    NautilusTrainingJobResponse,
     NautilusHealthResponse,
     NautilusReportResponse,
     NautilusBatchVerificationResponse
@@ -22,12 +27,29 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/nautilus", tags=["nautilus"])
 
+MAX_BATCH_BLOB_IDS = 1000
+
+@lru_cache(maxsize=1)
 def get_nautilus_service() -> NautilusService:
-    """Get Nautilus service instance with configuration"""
-    from app.core.config import get_nautilus_config
+    """Get the process-wide Nautilus service instance (shares one HTTP session to the enclave)"""
     config = get_nautilus_config()
     return NautilusService(config["enclave_endpoint"], config.get("aws_region", "us-east-1"))
 
+async def provide_nautilus_service() -> NautilusService:
+    """FastAPI dependency; async so it resolves on the event loop rather than via a threadpool hop"""
+    return get_nautilus_service()
+
+def _parse_blob_ids(blob_ids: str) -> List[str]:
+    """Split comma-separated blob IDs, rejecting the request once it exceeds MAX_BATCH_BLOB_IDS"""
+    parsed = []
+    for bid in blob_ids.split(","):
+        bid = bid.strip()
+        if bid:
+            if len(parsed) == MAX_BATCH_BLOB_IDS:
+                raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_BLOB_IDS} blob IDs per batch")
+            parsed.append(bid)
+    return parsed
+
 @router.post("/verify-quality", response_model=NautilusVerificationResponse)
 async def verify_data_quality(
     campaign_id: str = Form(...),
@@ -35,12 +57,10 @@ async def verify_data_quality(
     data_type: str = Form(...),  # "image", "text", "audio", etc.
     quality_threshold: float = Form(0.7),
     background_tasks: BackgroundTasks = BackgroundTasks(),
-    db: Session = Depends(get_session)
+    nautilus_service: NautilusService = Depends(provide_nautilus_service)
 ):
     """Verify data quality using Nautilus TEE"""
     
-    nautilus_service = get_nautilus_service()
-    
     verification_params = {
         "data_type": data_type,
         "quality_threshold": quality_threshold,
@@ -83,12 +103,10 @@ async def verify_data_authenticity(
     blob_id: str = Form(...),
     data_type: str = Form(...),
     background_tasks: BackgroundTasks = BackgroundTasks(),
-    db: Session = Depends(get_session)
+    nautilus_service: NautilusService = Depends(provide_nautilus_service)
 ):
     """Verify data authenticity (detect AI-generated content)"""
     
-    nautilus_service = get_nautilus_service()
-    
     verification_params = {
         "data_type": data_type,
         "check_deepfake": data_type in ["image", "video"],
@@ -119,20 +137,51 @@ async def verify_data_authenticity(
         logger.error(f"Error in authenticity verification: {e}")
         raise HTTPException(status_code=500, detail=f"Verification error: {str(e)}")
 
-@router.post("/train-model", response_model=NautilusTrainingResponse)
+async def _run_training_job(
+    nautilus_service: NautilusService,
+    job_id: str,
+    campaign_id: str,
+    dataset_blob_id: str,
+    model_config: Dict[str, Any],
+    redis: aioredis.Redis
+):
+    """Background task: runs the enclave training call and records the outcome for /train-model/{job_id}"""
+    try:
+        result = await nautilus_service.train_model_verifiable(campaign_id, dataset_blob_id, model_config)
+    except Exception as e:
+        logger.error(f"Error in model training: {e}")
+        await store_training_job(job_id, "ERROR", redis, message=f"Training error: {str(e)}")
+        return
+    
+    if not result:
+        await store_training_job(job_id, "ERROR", redis, message="Model training failed")
+        return
+    
+    training = NautilusTrainingResponse(
+        success=True,
+        campaign_id=campaign_id,
+        dataset_blob_id=dataset_blob_id,
+        model_type=model_config["model_type"],
+        training_metrics=result.get("model_metrics", {}),
+        model_artifact_blob_id=result.get("model_blob_id"),
+        verification_hash=result.get("verification_hash"),
+        training_verified=True
+    )
+    await store_training_job(job_id, "COMPLETED", redis, result=training.model_dump())
+
+@router.post("/train-model", response_model=NautilusTrainingJobResponse, status_code=202)
 async def train_model_verifiable(
+    background_tasks: BackgroundTasks,
     campaign_id: str = Form(...),
     dataset_blob_id: str = Form(...),
     model_type: str = Form(...),  # "text_classifier", "image_classifier", etc.
     epochs: int = Form(3),
     learning_rate: float = Form(0.001),
     batch_size: int = Form(32),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
-    db: Session = Depends(get_session)
+    nautilus_service: NautilusService = Depends(provide_nautilus_service),
+    redis: aioredis.Redis = Depends(get_redis)
 ):
-    """Train model with verifiable computation"""
-    
-    nautilus_service = get_nautilus_service()
+    """Start verifiable model training; training can take up to 30 minutes, so poll /train-model/{job_id}"""
     
     model_config = {
         "model_type": model_type,
@@ -145,28 +194,33 @@ async def train_model_verifiable(
     try:
         logger.info(f"Starting verifiable model training for campaign {campaign_id}")
         
-        result = await nautilus_service.train_model_verifiable(
-            campaign_id, dataset_blob_id, model_config
+        job_id = str(uuid.uuid4())
+        await store_training_job(job_id, "PENDING", redis)
+        background_tasks.add_task(
+            _run_training_job, nautilus_service, job_id, campaign_id, dataset_blob_id, model_config, redis
+        )
+        return NautilusTrainingJobResponse(
+            job_id=job_id,
+            status="PENDING",
+            message=f"Training started in background. Poll /nautilus/train-model/{job_id} for the result."
         )
-        
-        if result:
-            return NautilusTrainingResponse(
-                success=True,
-                campaign_id=campaign_id,
-                dataset_blob_id=dataset_blob_id,
-                model_type=model_type,
-                training_metrics=result.get("model_metrics", {}),
-                model_artifact_blob_id=result.get("model_blob_id"),
-                verification_hash=result.get("verification_hash"),
-                training_verified=True
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Model training failed")
             
     except Exception as e:
-        logger.error(f"Error in model training: {e}")
+        logger.error(f"Error starting model training: {e}")
         raise HTTPException(status_code=500, detail=f"Training error: {str(e)}")
 
+@router.get("/train-model/{job_id}", response_model=NautilusTrainingJobResponse)
+async def get_training_job_status(
+    job_id: str,
+    redis: aioredis.Redis = Depends(get_redis)
+):
+    """Get the status (and, once finished, the result) of a verifiable training job"""
+    
+    job = await get_training_job(job_id, redis)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"No training job found for ID '{job_id}'. Results expire after 24 hours.")
+    return job
+
 @router.post("/batch-verify", response_model=NautilusBatchVerificationResponse)
 async def batch_verify_contributions(
     campaign_id: str = Form(...),
@@ -174,14 +228,11 @@ async def batch_verify_contributions(
     data_type: str = Form(...),
     quality_threshold: float = Form(0.7),
     background_tasks: BackgroundTasks = BackgroundTasks(),
-    db: Session = Depends(get_session)
+    nautilus_service: NautilusService = Depends(provide_nautilus_service)
 ):
     """Batch verify multiple contributions"""
     
-    nautilus_service = get_nautilus_service()
-    
-    # Parse blob IDs
-    blob_id_list = [bid.strip() for bid in blob_ids.split(",") if bid.strip()]
+    blob_id_list = _parse_blob_ids(blob_ids)
     
     if not blob_id_list:
         raise HTTPException(status_code=400, detail="No blob IDs provided")
@@ -219,12 +270,10 @@ async def batch_verify_contributions(
 @router.get("/report/{campaign_id}", response_model=NautilusReportResponse)
 async def get_verification_report(
     campaign_id: str,
-    db: Session = Depends(get_session)
+    nautilus_service: NautilusService = Depends(provide_nautilus_service)
 ):
     """Get comprehensive verification report for a campaign"""
     
-    nautilus_service = get_nautilus_service()
-    
     try:
         report = await nautilus_service.get_verification_report(campaign_id)
         
@@ -251,17 +300,13 @@ async def register_enclave(
     enclave_id: str = Form(...),
     pcr_values: str = Form(...),  # Base64 encoded
     public_key: str = Form(...),  # Base64 encoded
-    db: Session = Depends(get_session)
+    nautilus_service: NautilusService = Depends(provide_nautilus_service)
 ):
     """Register a new Nautilus enclave"""
     
-    nautilus_service = get_nautilus_service()
-    
     try:
-        import base64
-        
-        pcr_bytes = base64.b64decode(pcr_values)
-        pubkey_bytes = base64.b64decode(public_key)
+        pcr_bytes = base64.b64decode(pcr_values, validate=True)
+        pubkey_bytes = base64.b64decode(public_key, validate=True)
         
         success = await nautilus_service.register_enclave(enclave_id, pcr_bytes, pubkey_bytes)
         
@@ -279,11 +324,9 @@ async def register_enclave(
         raise HTTPException(status_code=500, detail=f"Registration error: {str(e)}")
 
 @router.get("/enclave/status")
-async def get_enclave_status():
+async def get_enclave_status(nautilus_service: NautilusService = Depends(provide_nautilus_service)):
     """Get current enclave status"""
     
-    nautilus_service = get_nautilus_service()
-    
     try:
         status = await nautilus_service.get_enclave_status()
         return status
@@ -293,11 +336,9 @@ async def get_enclave_status():
         raise HTTPException(status_code=500, detail=f"Status error: {str(e)}")
 
 @router.get("/enclave/attestation")
-async def get_attestation_document():
+async def get_attestation_document(nautilus_service: NautilusService = Depends(provide_nautilus_service)):
     """Get enclave attestation document"""
     
-    nautilus_service = get_nautilus_service()
-    
     try:
         attestation = await nautilus_service.get_attestation_document()
         
@@ -313,10 +354,9 @@ async def get_attestation_document():
         raise HTTPException(status_code=500, detail=f"Attestation error: {str(e)}")
 
 @router.get("/health", response_model=NautilusHealthResponse)
-async def health_check():
+async def health_check(nautilus_service: NautilusService = Depends(provide_nautilus_service)):
     """Check Nautilus service health"""
     
-    nautilus_service = get_nautilus_service()
     health_info = await nautilus_service.health_check()
     
     return NautilusHealthResponse(
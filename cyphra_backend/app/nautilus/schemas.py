@@ -1,8 +1,11 @@
 """
 Pydantic schemas for Nautilus API responses
+
+Free-form enclave payloads (metrics, summaries, per-item results) are typed as plain
+dict/list so pydantic-core passes them through instead of validating every key.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional
 from pydantic import BaseModel
 
 class NautilusVerificationResponse(BaseModel):
@@ -12,7 +15,7 @@ class NautilusVerificationResponse(BaseModel):
     verification_type: str  # "quality" or "authenticity"
     quality_score: float
     passes_threshold: bool
-    metrics: Dict[str, Any]
+    metrics: dict
     verified: bool
 
 class NautilusTrainingResponse(BaseModel):
@@ -20,25 +23,31 @@ class NautilusTrainingResponse(BaseModel):
     campaign_id: str
     dataset_blob_id: str
     model_type: str
-    training_metrics: Dict[str, Any]
+    training_metrics: dict
     model_artifact_blob_id: Optional[str] = None
     verification_hash: Optional[str] = None
     training_verified: bool
 
+class NautilusTrainingJobResponse(BaseModel):
+    job_id: str
+    status: str  # "PENDING", "COMPLETED" or "ERROR"
+    message: Optional[str] = None
+    result: Optional[NautilusTrainingResponse] = None
+
 class NautilusBatchVerificationResponse(BaseModel):
     success: bool
     campaign_id: str
     total_contributions: int
     verified_contributions: int
     failed_contributions: int
-    results: List[Dict[str, Any]]
+    results: list
 
 class NautilusReportResponse(BaseModel):
     campaign_id: str
     total_contributions: int
     verified_contributions: int
     average_quality_score: float
-    verification_summary: Dict[str, Any]
+    verification_summary: dict
     generated_at: Optional[str] = None
 
 class NautilusHealthResponse(BaseModel):
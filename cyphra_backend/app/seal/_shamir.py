@@ -0,0 +1,77 @@
+"""
+Shamir secret sharing over GF(256) for Seal key shares
+
+Each share is one x-coordinate byte followed by one y byte per secret byte, so a
+decryption key returned by a key server carries everything needed to recombine it.
+Arithmetic is table-driven and vectorized across the secret's bytes with numpy.
+"""
+
+import os
+from typing import List
+
+import numpy as np
+
+# log/antilog tables for GF(256) with the AES polynomial x^8 + x^4 + x^3 + x + 1 and generator 3;
+# EXP is doubled so LOG[a] + LOG[b] indexes it without a modulo.
+EXP = np.zeros(512, dtype=np.uint8)
+LOG = np.zeros(256, dtype=np.int32)
+_x = 1
+for _i in range(255):
+    EXP[_i] = _x
+    LOG[_x] = _i
+    _x ^= (_x << 1) ^ (0x11B if _x & 0x80 else 0)
+EXP[255:510] = EXP[:255]
+
+
+def _mul(a: np.ndarray, b: int) -> np.ndarray:
+    """Multiply a byte array by a scalar in GF(256)"""
+    if b == 0:
+        return np.zeros_like(a)
+    product = EXP[LOG[a] + LOG[b]]
+    product[a == 0] = 0
+    return product
+
+
+def _scalar_mul(a: int, b: int) -> int:
+    return 0 if a == 0 or b == 0 else int(EXP[LOG[a] + LOG[b]])
+
+
+def _scalar_inv(a: int) -> int:
+    return int(EXP[255 - LOG[a]])
+
+
+def split(secret: bytes, shares: int, threshold: int) -> List[bytes]:
+    """Split secret into `shares` shares, any `threshold` of which reconstruct it"""
+    if not 1 <= threshold <= shares <= 255:
+        raise ValueError(f"Invalid sharing parameters: threshold={threshold}, shares={shares}")
+
+    secret_bytes = np.frombuffer(secret, dtype=np.uint8)
+    # Row d holds the degree d+1 coefficient for every secret byte; the constant term is the secret
+    coefficients = np.array(bytearray(os.urandom((threshold - 1) * len(secret))), dtype=np.uint8).reshape(threshold - 1, len(secret))
+
+    result = []
+    for x in range(1, shares + 1):
+        # Horner evaluation, highest degree first
+        y = np.zeros(len(secret), dtype=np.uint8)
+        for row in coefficients[::-1]:
+            y = _mul(y, x) ^ row
+        y = _mul(y, x) ^ secret_bytes
+        result.append(bytes([x]) + y.tobytes())
+    return result
+
+
+def combine(shares: List[bytes]) -> bytes:
+    """Reconstruct the secret from shares produced by split (at least threshold of them)"""
+    xs = [share[0] for share in shares]
+    if len(set(xs)) != len(xs):
+        raise ValueError("Duplicate share coordinates")
+
+    secret = np.zeros(len(shares[0]) - 1, dtype=np.uint8)
+    for i, share in enumerate(shares):
+        # Lagrange basis polynomial for share i evaluated at x = 0
+        basis = 1
+        for j, x_j in enumerate(xs):
+            if j != i:
+                basis = _scalar_mul(basis, _scalar_mul(x_j, _scalar_inv(x_j ^ xs[i])))
+        secret ^= _mul(np.frombuffer(share, dtype=np.uint8, offset=1), basis)
+    return secret.tobytes()
@@ -0,0 +1,17 @@
+import uuid
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, JSON as SQLJSON, func as sql_func
+
+from app.core.database import Base
+
+
+class SealEncryptedBlob(Base):
+    __tablename__ = "seal_encrypted_blobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    policy_id = Column(String, nullable=False, unique=True, index=True)  # Decrypt looks blobs up by policy
+    campaign_id = Column(String, index=True)
+    filename = Column(String)
+    threshold = Column(Integer, nullable=False)
+    encrypted_shares = Column(SQLJSON, nullable=False)  # [{"server": name, "share": base64 RSA-OAEP share}]
+    ciphertext = Column(LargeBinary, nullable=False)  # SealService.encrypt_stream output; written once
+    created_at = Column(DateTime(timezone=True), server_default=sql_func.now())
@@ -3,39 +3,74 @@ Seal API Routes for Cyphra
 Handles HTTP endpoints for encryption and access control
 """
 
+import aiofiles.tempfile
 import logging
-import tempfile
-import json
+import orjson
 from typing import Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, Form, UploadFile, File
+from cachetools import LRUCache
+from fastapi import APIRouter, HTTPException, Depends, Form, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from cryptography.exceptions import InvalidTag
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_session
+from app.core.config import get_upload_config
+from app.core.database import AsyncSessionLocal, get_session, get_async_session
+from app.core.enums.seal import SealPolicyType
+from app.seal.models import SealEncryptedBlob
 from app.seal.service import SealService
 from app.seal.schemas import (
     SealEncryptResponse,
     SealDecryptResponse, 
     SealPolicyResponse,
-    SealHealthResponse
+    SealHealthResponse,
+    SealServerStatus
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/seal", tags=["seal"])
 
-def get_seal_service() -> SealService:
-    """Get Seal service instance with configuration"""
-    from app.core.config import get_seal_config
-    config = get_seal_config()
-    return SealService(config["key_servers"], config["threshold"])
+SEAL_STREAM_CHUNK_SIZE = 1 << 20  # 1 MiB plaintext per encrypted frame
+
+# Response models below are built with model_construct: every field comes from this
+# service, so re-validating it is wasted work. Request input still goes through Form(...).
+
+# Statements are built once; SQLAlchemy caches their compiled form, so each lookup only binds policy_id.
+_SELECT_BLOB_METADATA = select(SealEncryptedBlob.filename, SealEncryptedBlob.encrypted_shares).where(
+    SealEncryptedBlob.policy_id == bindparam("policy_id")
+)
+# Ciphertext is read one slice at a time (substr is 1-based) so a decrypt holds one chunk, not the blob.
+_SELECT_BLOB_CIPHERTEXT_SLICE = select(
+    func.substr(SealEncryptedBlob.ciphertext, bindparam("start"), bindparam("length"))
+).where(SealEncryptedBlob.policy_id == bindparam("policy_id"))
+# Encrypted blobs are written once and never modified, so their metadata can be cached without invalidation.
+_blob_metadata: LRUCache = LRUCache(maxsize=4096)
+
+async def _load_blob_metadata(policy_id: str, db: AsyncSession) -> Optional[Dict[str, Any]]:
+    """Filename and key shares for a policy's encrypted blob (the ciphertext itself is not cached)"""
+    blob = _blob_metadata.get(policy_id)
+    if blob is None:
+        row = (await db.execute(_SELECT_BLOB_METADATA, {"policy_id": policy_id})).one_or_none()
+        if row is None:
+            return None
+        blob = {"filename": row.filename, "encrypted_shares": row.encrypted_shares}
+        _blob_metadata[policy_id] = blob
+    return blob
+
+async def get_seal_service(request: Request) -> SealService:
+    """FastAPI dependency returning the shared Seal service stored on app.state"""
+    return request.app.state.seal_service
 
 @router.post("/encrypt", response_model=SealEncryptResponse)
 async def encrypt_file(
     campaign_id: str = Form(...),
-    policy_type: str = Form(...),  # "subscription", "allowlist", "timelock"
+    policy_type: SealPolicyType = Form(...),
     file: UploadFile = File(...),
     policy_params: str = Form("{}"),  # JSON string with policy parameters
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session),
+    seal_service: SealService = Depends(get_seal_service)
 ):
     """Encrypt file with Seal"""
     
@@ -44,40 +79,68 @@ async def encrypt_file(
     
     try:
         # Parse policy parameters
-        policy_params_dict = json.loads(policy_params)
-    except json.JSONDecodeError:
+        policy_params_dict = orjson.loads(policy_params)
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid policy_params JSON")
     
-    seal_service = get_seal_service()
+    # The bytea column takes the ciphertext as one value, so uploads are capped at MAX_FILE_SIZE
+    max_file_size = get_upload_config()["max_file_size"]
+    if file.size is not None and file.size > max_file_size:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {max_file_size} byte upload limit")
+    
+    original_size = 0
+    
+    async def _file_chunks():
+        nonlocal original_size
+        while chunk := await file.read(SEAL_STREAM_CHUNK_SIZE):
+            original_size += len(chunk)
+            if original_size > max_file_size:
+                raise HTTPException(status_code=413, detail=f"File exceeds the {max_file_size} byte upload limit")
+            yield chunk
     
     try:
-        # Read file data
-        file_data = await file.read()
-        
         # Create policy ID
-        policy_id = await seal_service.create_access_policy(policy_type, policy_params_dict)
+        policy_id = seal_service.create_access_policy(policy_type.value, policy_params_dict)
         if not policy_id:
             raise HTTPException(status_code=500, detail="Failed to create access policy")
         
-        # Encrypt data
-        encrypted_result = await seal_service.encrypt_data(file_data, policy_id, policy_params_dict)
+        sealed_key = await seal_service.create_sealed_key(policy_id)
+        if not sealed_key:
+            raise HTTPException(status_code=500, detail="Encryption failed")
+        symmetric_key, encrypted_shares = sealed_key
         
-        if encrypted_result:
-            # TODO: Store encrypted data metadata in database
-            # This would also call the smart contract function set_seal_policy
+        # Encrypt the upload frame by frame into a spool file; disk I/O runs off the event loop
+        async with aiofiles.tempfile.TemporaryFile("w+b") as encrypted_file:
+            async for frame in seal_service.encrypt_stream(_file_chunks(), symmetric_key, policy_id):
+                await encrypted_file.write(frame)
+            encrypted_size = await encrypted_file.tell()
+            await encrypted_file.seek(0)
             
-            return SealEncryptResponse(
-                success=True,
+            # The bytea column needs the whole ciphertext in one value; this is the one full
+            # buffer left on the encrypt path (bounded by MAX_FILE_SIZE) until blobs move to object storage.
+            db.add(SealEncryptedBlob(
                 policy_id=policy_id,
-                policy_type=policy_type,
-                encrypted_size=len(encrypted_result["encrypted_data"]),
-                original_size=len(file_data),
+                campaign_id=campaign_id,
                 filename=file.filename,
-                threshold=encrypted_result["threshold"]
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Encryption failed")
+                threshold=seal_service.threshold,
+                encrypted_shares=encrypted_shares,
+                ciphertext=await encrypted_file.read()
+            ))
+            await db.commit()
+            # TODO: Call the smart contract function set_seal_policy
+        
+        return SealEncryptResponse.model_construct(
+            success=True,
+            policy_id=policy_id,
+            policy_type=policy_type.value,
+            encrypted_size=encrypted_size,
+            original_size=original_size,
+            filename=file.filename,
+            threshold=seal_service.threshold
+        )
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error encrypting file: {e}")
         raise HTTPException(status_code=500, detail=f"Encryption error: {str(e)}")
@@ -87,36 +150,60 @@ async def decrypt_file(
     policy_id: str = Form(...),
     access_token: str = Form(...),
     requester_address: str = Form(...),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session),
+    seal_service: SealService = Depends(get_seal_service)
 ):
     """Decrypt file with Seal"""
     
-    seal_service = get_seal_service()
-    
     try:
         # Verify access permission
-        has_access = await seal_service.verify_access_permission(policy_id, requester_address, access_token)
+        has_access = seal_service.verify_access_permission(policy_id, requester_address, access_token)
         if not has_access:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        # TODO: Get encrypted data from database
-        encrypted_data = {}  # This would be retrieved from database
-        
-        if not encrypted_data:
+        blob = await _load_blob_metadata(policy_id, db)
+        if not blob:
             raise HTTPException(status_code=404, detail="Encrypted data not found")
         
-        # Decrypt data
-        decrypted_data = await seal_service.decrypt_data(encrypted_data, access_token)
+        symmetric_key = await seal_service.recover_key(blob["encrypted_shares"], policy_id, access_token)
+        if not symmetric_key:
+            raise HTTPException(status_code=403, detail="Decryption failed or access denied")
         
-        if decrypted_data:
-            from fastapi.responses import Response
-            return Response(
-                content=decrypted_data,
-                media_type="application/octet-stream",
-                headers={"Content-Disposition": f"attachment; filename=decrypted_{policy_id}"}
-            )
-        else:
+        async def _ciphertext_chunks():
+            # Own session: the request-scoped one is closed before the response body streams
+            async with AsyncSessionLocal() as session:
+                start = 1
+                while True:
+                    chunk = (await session.execute(
+                        _SELECT_BLOB_CIPHERTEXT_SLICE,
+                        {"policy_id": policy_id, "start": start, "length": SEAL_STREAM_CHUNK_SIZE}
+                    )).scalar_one()
+                    if chunk:
+                        yield chunk
+                    if len(chunk) < SEAL_STREAM_CHUNK_SIZE:
+                        break
+                    start += SEAL_STREAM_CHUNK_SIZE
+        
+        # A wrong key or tampered blob fails on the first frame; report it before the 200 starts
+        plaintext = seal_service.decrypt_stream(_ciphertext_chunks(), symmetric_key, policy_id)
+        try:
+            first_chunk = await anext(plaintext)
+        except StopAsyncIteration:
+            first_chunk = b""
+        except (InvalidTag, ValueError):
             raise HTTPException(status_code=403, detail="Decryption failed or access denied")
+        
+        async def _plaintext_chunks():
+            if first_chunk:
+                yield first_chunk
+            async for chunk in plaintext:
+                yield chunk
+        
+        return StreamingResponse(
+            _plaintext_chunks(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f"attachment; filename=decrypted_{blob['filename'] or policy_id}"}
+        )
             
     except HTTPException:
         raise
@@ -126,35 +213,30 @@ async def decrypt_file(
 
 @router.post("/create-policy", response_model=SealPolicyResponse)
 async def create_access_policy(
-    policy_type: str = Form(...),
+    policy_type: SealPolicyType = Form(...),
     policy_params: str = Form("{}"),
     campaign_id: str = Form(...),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_session),
+    seal_service: SealService = Depends(get_seal_service)
 ):
     """Create a new access control policy"""
     
     try:
         # Parse policy parameters
-        policy_params_dict = json.loads(policy_params)
-    except json.JSONDecodeError:
+        policy_params_dict = orjson.loads(policy_params)
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid policy_params JSON")
     
-    # Validate policy type
-    if policy_type not in ["subscription", "allowlist", "timelock"]:
-        raise HTTPException(status_code=400, detail="Invalid policy type")
-    
-    seal_service = get_seal_service()
-    
     try:
-        policy_id = await seal_service.create_access_policy(policy_type, policy_params_dict)
+        policy_id = seal_service.create_access_policy(policy_type.value, policy_params_dict)
         
         if policy_id:
             # TODO: Store policy in database and call smart contract
             
-            return SealPolicyResponse(
+            return SealPolicyResponse.model_construct(
                 success=True,
                 policy_id=policy_id,
-                policy_type=policy_type,
+                policy_type=policy_type.value,
                 campaign_id=campaign_id,
                 params=policy_params_dict
             )
@@ -186,14 +268,13 @@ async def verify_access(
     policy_id: str = Form(...),
     requester_address: str = Form(...),
     access_token: str = Form(...),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_session),
+    seal_service: SealService = Depends(get_seal_service)
 ):
     """Verify if requester has access to encrypted data"""
     
-    seal_service = get_seal_service()
-    
     try:
-        has_access = await seal_service.verify_access_permission(policy_id, requester_address, access_token)
+        has_access = seal_service.verify_access_permission(policy_id, requester_address, access_token)
         
         return {
             "policy_id": policy_id,
@@ -220,14 +301,13 @@ async def get_campaign_policies(
     }
 
 @router.get("/health", response_model=SealHealthResponse)
-async def health_check():
+async def health_check(seal_service: SealService = Depends(get_seal_service)):
     """Check Seal key servers health"""
     
-    seal_service = get_seal_service()
     health_info = await seal_service.health_check()
     
-    return SealHealthResponse(
-        servers=health_info["servers"],
+    return SealHealthResponse.model_construct(
+        servers=[SealServerStatus.model_construct(**server) for server in health_info["servers"]],
         healthy_count=health_info["healthy_count"],
         threshold=health_info["threshold"],
         overall_healthy=health_info["overall_healthy"],
@@ -7,63 +7,133 @@ import asyncio
 import aiohttp
 import json
 import logging
-from typing import Optional, Dict, Any, List
-from cryptography.hazmat.primitives import hashes, serialization, padding
-from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import base64
 import os
+import time
+import zstandard as zstd
 from datetime import datetime, timedelta
+from cachetools import TTLCache
+
+from app.core.config import get_seal_config
+from app.seal import _shamir
 
 logger = logging.getLogger(__name__)
 
+# Key server public keys rotate on the order of hours, so encrypts reuse a fetched key this long.
+PUBLIC_KEY_TTL_SECONDS = 3600
+HEALTH_PROBE_TIMEOUT = aiohttp.ClientTimeout(total=5)
+HEALTH_CACHE_SECONDS = 2
+# Plaintext is zstd-compressed before encryption unless it is small or already looks compressed.
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_SAMPLE_BYTES = 4096
+STREAM_FLAG_ZSTD = 0x01
+_zstd_probe = zstd.ZstdCompressor(level=1)
+
+_OAEP_SHA256 = padding.OAEP(mgf=padding.MGF1(algorithm=hashes.SHA256()), algorithm=hashes.SHA256(), label=None)
+
+def _rsa_oaep_encrypt(public_key: rsa.RSAPublicKey, plaintext: bytes) -> bytes:
+    # OpenSSL releases the GIL here, so shares encrypted via to_thread run in parallel
+    return public_key.encrypt(plaintext, _OAEP_SHA256)
+
+def _worth_compressing(sample: bytes) -> bool:
+    """Skip small payloads and ones whose first COMPRESS_SAMPLE_BYTES barely compress (media, archives)"""
+    if len(sample) < COMPRESS_MIN_BYTES:
+        return False
+    sample = sample[:COMPRESS_SAMPLE_BYTES]
+    return len(_zstd_probe.compress(sample)) < len(sample) * 0.9
+
+async def _prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield first
+    async for chunk in rest:
+        yield chunk
+
 class SealService:
     def __init__(self, key_servers: List[Dict[str, str]], threshold: int):
         self.key_servers = key_servers
         self.threshold = threshold
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._public_keys: TTLCache = TTLCache(maxsize=256, ttl=PUBLIC_KEY_TTL_SECONDS)  # server name -> parsed public key
+        self._public_key_locks: Dict[str, asyncio.Lock] = {}
+        self._health: Optional[Tuple[float, Dict[str, Any]]] = None  # (expires_at, last health_check result)
+        self._zstd_c = zstd.ZstdCompressor(level=3)
+        self._zstd_d = zstd.ZstdDecompressor()
+    
+    async def _session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session to the key servers, created on first use inside the event loop"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, limit_per_host=16, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._http
+    
+    async def warm(self):
+        """Prefetch key server public keys so the first encrypt doesn't pay for them"""
+        public_keys = await self._get_public_keys()
+        logger.info(f"Warmed {len(public_keys)}/{len(self.key_servers)} key server public keys")
+    
+    async def close(self):
+        """Close the shared HTTP session (called on app shutdown)"""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        
+    async def create_sealed_key(self, policy_id: str) -> Optional[Tuple[bytes, List[Dict[str, str]]]]:
+        """Generate a symmetric data key and its threshold-encrypted shares"""
+        # Get public keys from key servers; each share goes to exactly the server whose key encrypts it
+        server_keys = await self._get_public_keys()
+        
+        if len(server_keys) < self.threshold:
+            logger.error(f"Not enough key servers available: {len(server_keys)} < {self.threshold}")
+            return None
+        
+        # Generate symmetric key for actual data encryption
+        symmetric_key = os.urandom(32)  # 256-bit key
         
+        # Split the symmetric key so any threshold servers can rebuild it, then encrypt each share
+        key_shares = _shamir.split(symmetric_key, len(server_keys), self.threshold)
+        shares = await asyncio.gather(*(
+            self._encrypt_key_share(key_share, public_key, policy_id, server["name"])
+            for key_share, (server, public_key) in zip(key_shares, server_keys)
+        ))
+        encrypted_shares = [
+            {"server": server["name"], "share": share}
+            for (server, _), share in zip(server_keys, shares)
+            if share
+        ]
+        
+        if len(encrypted_shares) < self.threshold:
+            logger.error(f"Failed to encrypt enough key shares: {len(encrypted_shares)} < {self.threshold}")
+            return None
+        
+        return symmetric_key, encrypted_shares
+    
     async def encrypt_data(self, data: bytes, policy_id: str, policy_params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """Encrypt data with Seal identity-based encryption"""
         try:
             logger.info(f"Encrypting data with policy: {policy_id}")
             
-            # Get public keys from key servers
-            public_keys = await self._get_public_keys()
-            
-            if len(public_keys) < self.threshold:
-                logger.error(f"Not enough key servers available: {len(public_keys)} < {self.threshold}")
+            sealed_key = await self.create_sealed_key(policy_id)
+            if not sealed_key:
                 return None
+            symmetric_key, encrypted_shares = sealed_key
+            nonce = os.urandom(12)  # 96-bit GCM nonce
             
-            # Generate symmetric key for actual data encryption
-            symmetric_key = os.urandom(32)  # 256-bit key
-            iv = os.urandom(16)  # 128-bit IV
-            
-            # Encrypt data with AES
-            cipher = Cipher(algorithms.AES(symmetric_key), modes.CBC(iv), backend=default_backend())
-            encryptor = cipher.encryptor()
-            
-            # Pad data to block size
-            padded_data = self._pad_data(data)
-            encrypted_data = encryptor.update(padded_data) + encryptor.finalize()
+            compressed = _worth_compressing(data)
+            if compressed:
+                data = self._zstd_c.compress(data)
             
-            # Encrypt symmetric key with threshold encryption
-            encrypted_shares = []
-            for i, server in enumerate(self.key_servers[:len(public_keys)]):
-                share = await self._encrypt_key_share(symmetric_key, public_keys[i], policy_id, server["name"])
-                if share:
-                    encrypted_shares.append({
-                        "server": server["name"],
-                        "share": share
-                    })
-            
-            if len(encrypted_shares) < self.threshold:
-                logger.error(f"Failed to encrypt enough key shares: {len(encrypted_shares)} < {self.threshold}")
-                return None
+            # Encrypt data with AES-GCM (authenticated, no padding); the policy ID is bound as associated data
+            encrypted_data = AESGCM(symmetric_key).encrypt(nonce, data, policy_id.encode())
             
             result = {
-                "encrypted_data": base64.b64encode(encrypted_data).decode(),
-                "iv": base64.b64encode(iv).decode(),
+                "encrypted_data": encrypted_data,  # Raw bytes; base64 only at a JSON boundary
+                "nonce": nonce,
+                "compressed": compressed,
                 "encrypted_shares": encrypted_shares,
                 "policy_id": policy_id,
                 "policy_params": policy_params or {},
@@ -78,44 +148,148 @@ class SealService:
             logger.error(f"Encryption error: {e}")
             return None
     
+    async def encrypt_stream(self, chunks: AsyncIterator[bytes], symmetric_key: bytes, policy_id: str) -> AsyncIterator[bytes]:
+        """Encrypt a stream of plaintext chunks into framed AES-GCM ciphertext
+        
+        Output is a flags byte (STREAM_FLAG_ZSTD when the plaintext was compressed first) and an
+        8-byte random nonce prefix, followed by one frame per chunk: a 4-byte big-endian length,
+        then the chunk's ciphertext. Each frame's nonce is the prefix plus its 4-byte index, and
+        the associated data covers the flags and marks the final frame so truncation is detected.
+        """
+        aesgcm = AESGCM(symmetric_key)
+        nonce_prefix = os.urandom(8)
+        chunks = aiter(chunks)
+        first = await anext(chunks, b"")
+        flags = STREAM_FLAG_ZSTD if _worth_compressing(first) else 0
+        aad = policy_id.encode() + bytes([flags])
+        yield bytes([flags]) + nonce_prefix
+        
+        plaintext = self._compress_chunks(first, chunks) if flags & STREAM_FLAG_ZSTD else _prepend(first, chunks)
+        index = 0
+        pending = None
+        async for chunk in plaintext:
+            if not chunk:
+                continue  # The compressor emits nothing until it has a full block
+            if pending is not None:
+                for part in self._seal_frame(aesgcm, nonce_prefix, index, pending, aad, final=False):
+                    yield part
+                index += 1
+            pending = chunk
+        for part in self._seal_frame(aesgcm, nonce_prefix, index, pending or b"", aad, final=True):
+            yield part
+    
+    async def decrypt_stream(self, frames: AsyncIterator[bytes], symmetric_key: bytes, policy_id: str) -> AsyncIterator[bytes]:
+        """Decrypt the output of encrypt_stream, yielding plaintext as each frame is opened"""
+        aesgcm = AESGCM(symmetric_key)
+        buffer = bytearray()
+        nonce_prefix = None
+        decompressor = None
+        aad = b""
+        index = 0
+        finished = False
+        async for data in frames:
+            buffer += data
+            if nonce_prefix is None:
+                if len(buffer) < 9:
+                    continue
+                flags = buffer[0]
+                nonce_prefix = bytes(buffer[1:9])
+                del buffer[:9]
+                aad = policy_id.encode() + bytes([flags])
+                if flags & STREAM_FLAG_ZSTD:
+                    decompressor = self._zstd_d.decompressobj()
+            while len(buffer) >= 4:
+                frame_len = int.from_bytes(buffer[:4], "big")
+                if len(buffer) < 4 + frame_len:
+                    break
+                if finished:
+                    raise ValueError("Encrypted stream has data after its final frame")
+                with memoryview(buffer) as view:
+                    frame = bytes(view[4:4 + frame_len])  # One copy, not a bytearray slice then bytes()
+                del buffer[:4 + frame_len]
+                nonce = nonce_prefix + index.to_bytes(4, "big")
+                try:
+                    plaintext = aesgcm.decrypt(nonce, frame, aad + b"\x00")
+                except InvalidTag:
+                    # Not an intermediate frame; it must be the last one
+                    plaintext = aesgcm.decrypt(nonce, frame, aad + b"\x01")
+                    finished = True
+                index += 1
+                if decompressor is not None:
+                    plaintext = decompressor.decompress(plaintext)
+                if plaintext:
+                    yield plaintext
+        if not finished or buffer:
+            raise ValueError("Encrypted stream is truncated or has trailing data")
+    
+    async def _compress_chunks(self, first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        compressor = self._zstd_c.compressobj()
+        yield compressor.compress(first)
+        async for chunk in rest:
+            yield compressor.compress(chunk)
+        yield compressor.flush()
+    
+    @staticmethod
+    def _seal_frame(aesgcm: AESGCM, nonce_prefix: bytes, index: int, chunk: bytes, aad: bytes, final: bool) -> Tuple[bytes, bytes]:
+        """Encrypt one frame, returning its length header and ciphertext separately so neither is copied"""
+        nonce = nonce_prefix + index.to_bytes(4, "big")
+        ciphertext = aesgcm.encrypt(nonce, chunk, aad + (b"\x01" if final else b"\x00"))
+        return len(ciphertext).to_bytes(4, "big"), ciphertext
+    
+    async def recover_key(self, encrypted_shares: List[Dict[str, str]], policy_id: str, access_token: str) -> Optional[bytes]:
+        """Rebuild a data key from threshold key servers' decryption responses"""
+        # Ask every server at once, but stop as soon as threshold keys are in hand
+        tasks = [
+            asyncio.create_task(self._request_decryption_key(
+                share["server"],
+                policy_id,
+                access_token,
+                share["share"]
+            ))
+            for share in encrypted_shares
+        ]
+        decryption_keys = []
+        try:
+            for next_key in asyncio.as_completed(tasks):
+                key = await next_key
+                if key:
+                    decryption_keys.append(key)
+                    if len(decryption_keys) >= self.threshold:
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        # Check if we have enough keys
+        if len(decryption_keys) < self.threshold:
+            logger.error(f"Not enough decryption keys: {len(decryption_keys)} < {self.threshold}")
+            return None
+        
+        # Combine keys to reconstruct symmetric key
+        symmetric_key = self._combine_key_shares(decryption_keys[:self.threshold])
+        
+        if not symmetric_key:
+            logger.error("Failed to reconstruct symmetric key")
+            return None
+        return symmetric_key
+    
     async def decrypt_data(self, encrypted_data: Dict[str, Any], access_token: str) -> Optional[bytes]:
         """Decrypt data using threshold decryption"""
         try:
             logger.info(f"Decrypting data with policy: {encrypted_data.get('policy_id')}")
             
-            # Request decryption keys from servers
-            decryption_keys = []
-            for share in encrypted_data["encrypted_shares"]:
-                key = await self._request_decryption_key(
-                    share["server"], 
-                    encrypted_data["policy_id"],
-                    access_token,
-                    share["share"]
-                )
-                if key:
-                    decryption_keys.append(key)
-            
-            # Check if we have enough keys
-            if len(decryption_keys) < self.threshold:
-                logger.error(f"Not enough decryption keys: {len(decryption_keys)} < {self.threshold}")
-                return None
-            
-            # Combine keys to reconstruct symmetric key
-            symmetric_key = self._combine_key_shares(decryption_keys[:self.threshold])
-            
+            symmetric_key = await self.recover_key(
+                encrypted_data["encrypted_shares"], encrypted_data["policy_id"], access_token
+            )
             if not symmetric_key:
-                logger.error("Failed to reconstruct symmetric key")
                 return None
             
             # Decrypt data
-            encrypted_bytes = base64.b64decode(encrypted_data["encrypted_data"])
-            iv = base64.b64decode(encrypted_data["iv"])
-            
-            cipher = Cipher(algorithms.AES(symmetric_key), modes.CBC(iv), backend=default_backend())
-            decryptor = cipher.decryptor()
-            
-            padded_data = decryptor.update(encrypted_bytes) + decryptor.finalize()
-            data = self._unpad_data(padded_data)
+            data = AESGCM(symmetric_key).decrypt(
+                encrypted_data["nonce"], encrypted_data["encrypted_data"], encrypted_data["policy_id"].encode()
+            )
+            if encrypted_data.get("compressed"):
+                data = self._zstd_d.decompress(data)
             
             logger.info("Successfully decrypted data")
             return data
@@ -124,7 +298,7 @@ class SealService:
             logger.error(f"Decryption error: {e}")
             return None
     
-    async def create_access_policy(self, policy_type: str, policy_params: Dict[str, Any]) -> str:
+    def create_access_policy(self, policy_type: str, policy_params: Dict[str, Any]) -> str:
         """Create a new access policy"""
         try:
             policy_id = f"{policy_type}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{os.urandom(4).hex()}"
@@ -146,7 +320,7 @@ class SealService:
             logger.error(f"Error creating access policy: {e}")
             return None
     
-    async def verify_access_permission(self, policy_id: str, requester_address: str, access_token: str) -> bool:
+    def verify_access_permission(self, policy_id: str, requester_address: str, access_token: str) -> bool:
         """Verify if requester has access permission"""
         try:
             # TODO: Implement actual policy verification
@@ -160,44 +334,54 @@ class SealService:
             logger.error(f"Error verifying access permission: {e}")
             return False
     
-    async def _get_public_keys(self) -> List[bytes]:
-        """Get public keys from all key servers"""
-        public_keys = []
-        
-        for server in self.key_servers:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(f"{server['endpoint']}/public-key", timeout=10) as response:
-                        if response.status == 200:
-                            key_data = await response.json()
-                            public_key_bytes = base64.b64decode(key_data["public_key"])
-                            public_keys.append(public_key_bytes)
-                            logger.info(f"Retrieved public key from {server['name']}")
-                        else:
-                            logger.warning(f"Failed to get public key from {server['name']}: {response.status}")
-            except Exception as e:
-                logger.warning(f"Error getting public key from {server['name']}: {e}")
+    async def _get_public_keys(self) -> List[Tuple[Dict[str, str], rsa.RSAPublicKey]]:
+        """(server, public key) for every key server that answered (queried concurrently)"""
+        public_keys = await asyncio.gather(*(self._get_public_key(server) for server in self.key_servers))
+        return [(server, key) for server, key in zip(self.key_servers, public_keys) if key]
+    
+    async def _get_public_key(self, server: Dict[str, str]) -> Optional[rsa.RSAPublicKey]:
+        """Get one key server's public key, served from cache for PUBLIC_KEY_TTL_SECONDS"""
+        public_key = self._public_keys.get(server["name"])
+        if public_key is not None:
+            return public_key
         
-        return public_keys
+        # One refresh per server at a time; concurrent callers wait and reuse its result
+        async with self._public_key_locks.setdefault(server["name"], asyncio.Lock()):
+            public_key = self._public_keys.get(server["name"])
+            if public_key is None:
+                public_key = await self._fetch_public_key(server)
+                if public_key is not None:
+                    self._public_keys[server["name"]] = public_key
+            return public_key
+    
+    def invalidate_public_keys(self):
+        """Drop cached key server public keys (e.g. after a key rotation)"""
+        self._public_keys.clear()
     
-    async def _encrypt_key_share(self, symmetric_key: bytes, public_key: bytes, policy_id: str, server_name: str) -> Optional[str]:
+    async def _fetch_public_key(self, server: Dict[str, str]) -> Optional[rsa.RSAPublicKey]:
+        """Fetch one key server's public key, parsed once here so encrypts skip the DER decode"""
+        try:
+            session = await self._session()
+            async with session.get(f"{server['endpoint']}/public-key", timeout=10) as response:
+                if response.status == 200:
+                    key_data = await response.json()
+                    public_key = serialization.load_der_public_key(
+                        base64.b64decode(key_data["public_key"])
+                    )
+                    logger.info(f"Retrieved public key from {server['name']}")
+                    return public_key
+                else:
+                    logger.warning(f"Failed to get public key from {server['name']}: {response.status}")
+                    return None
+        except Exception as e:
+            logger.warning(f"Error getting public key from {server['name']}: {e}")
+            return None
+    
+    async def _encrypt_key_share(self, key_share: bytes, public_key: rsa.RSAPublicKey, policy_id: str, server_name: str) -> Optional[str]:
         """Encrypt symmetric key share with server's public key"""
         try:
-            # Load public key
-            public_key_obj = serialization.load_der_public_key(public_key, backend=default_backend())
-            
-            # Create key share (simplified - in real implementation would use proper secret sharing)
-            key_share = symmetric_key  # Simplified: using full key for each share
-            
-            # Encrypt key share
-            encrypted_share = public_key_obj.encrypt(
-                key_share,
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                    algorithm=hashes.SHA256(),
-                    label=None
-                )
-            )
+            # Encrypt key share (RSA-OAEP is CPU-bound; keep it off the event loop)
+            encrypted_share = await asyncio.to_thread(_rsa_oaep_encrypt, public_key, key_share)
             
             return base64.b64encode(encrypted_share).decode()
             
@@ -212,22 +396,22 @@ class SealService:
             return None
         
         try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "policy_id": policy_id,
-                    "access_token": access_token,
-                    "encrypted_share": encrypted_share
-                }
-                
-                async with session.post(f"{server['endpoint']}/decrypt", json=payload, timeout=10) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        decryption_key = base64.b64decode(result["decryption_key"])
-                        logger.info(f"Retrieved decryption key from {server_name}")
-                        return decryption_key
-                    else:
-                        logger.warning(f"Failed to get decryption key from {server_name}: {response.status}")
-                        return None
+            session = await self._session()
+            payload = {
+                "policy_id": policy_id,
+                "access_token": access_token,
+                "encrypted_share": encrypted_share
+            }
+            
+            async with session.post(f"{server['endpoint']}/decrypt", json=payload, timeout=10) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    decryption_key = base64.b64decode(result["decryption_key"])
+                    logger.info(f"Retrieved decryption key from {server_name}")
+                    return decryption_key
+                else:
+                    logger.warning(f"Failed to get decryption key from {server_name}: {response.status}")
+                    return None
                         
         except Exception as e:
             logger.warning(f"Error requesting decryption key from {server_name}: {e}")
@@ -236,57 +420,49 @@ class SealService:
     def _combine_key_shares(self, key_shares: List[bytes]) -> Optional[bytes]:
         """Combine key shares to reconstruct symmetric key"""
         try:
-            # Simplified: just return the first key share
-            # In real implementation, would use proper secret sharing reconstruction
-            return key_shares[0] if key_shares else None
+            return _shamir.combine(key_shares) if key_shares else None
             
         except Exception as e:
             logger.error(f"Error combining key shares: {e}")
             return None
     
-    def _pad_data(self, data: bytes) -> bytes:
-        """Add PKCS7 padding to data"""
-        block_size = 16  # AES block size
-        padding_length = block_size - (len(data) % block_size)
-        padding = bytes([padding_length] * padding_length)
-        return data + padding
-    
-    def _unpad_data(self, padded_data: bytes) -> bytes:
-        """Remove PKCS7 padding from data"""
-        padding_length = padded_data[-1]
-        return padded_data[:-padding_length]
+    async def _server_status(self, server: Dict[str, str]) -> Dict[str, Any]:
+        """Probe one key server's health endpoint"""
+        try:
+            session = await self._session()
+            async with session.get(f"{server['endpoint']}/health", timeout=HEALTH_PROBE_TIMEOUT) as response:
+                healthy = response.status == 200
+        except Exception:
+            healthy = False
+        
+        return {
+            "name": server["name"],
+            "endpoint": server["endpoint"],
+            "healthy": healthy
+        }
     
     async def health_check(self) -> Dict[str, Any]:
-        """Check Seal key servers health"""
+        """Check Seal key servers health
+        
+        Results are reused for HEALTH_CACHE_SECONDS so frequent /health polling can't flood the key servers.
+        """
+        if self._health is not None and time.monotonic() < self._health[0]:
+            return self._health[1]
+        
         try:
-            server_status = []
-            
-            for server in self.key_servers:
-                try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(f"{server['endpoint']}/health", timeout=5) as response:
-                            healthy = response.status == 200
-                            server_status.append({
-                                "name": server["name"],
-                                "endpoint": server["endpoint"],
-                                "healthy": healthy
-                            })
-                except:
-                    server_status.append({
-                        "name": server["name"],
-                        "endpoint": server["endpoint"],
-                        "healthy": False
-                    })
+            server_status = list(await asyncio.gather(*(self._server_status(server) for server in self.key_servers)))
             
             healthy_count = sum(1 for s in server_status if s["healthy"])
             overall_healthy = healthy_count >= self.threshold
             
-            return {
+            health = {
                 "servers": server_status,
                 "healthy_count": healthy_count,
                 "threshold": self.threshold,
                 "overall_healthy": overall_healthy
             }
+            self._health = (time.monotonic() + HEALTH_CACHE_SECONDS, health)
+            return health
             
         except Exception as e:
             logger.error(f"Exception in Seal health check: {e}")
@@ -297,3 +473,8 @@ class SealService:
                 "overall_healthy": False,
                 "error": str(e)
             }
+
+def create_seal_service() -> SealService:
+    """Builds the process-wide Seal service (owned by the app lifespan)"""
+    config = get_seal_config()
+    return SealService(config["key_servers"], config["threshold"])
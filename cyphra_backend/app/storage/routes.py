@@ -1,18 +1,29 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query, BackgroundTasks, Depends
-from typing import Optional, Union
-import tempfile
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Depends
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+import asyncio
 import mimetypes
 import logging
+import time
 import os # For path manipulation
-import shutil # For removing directory tree
+import uuid
+from urllib.parse import quote
 from pathlib import Path
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
+from sqlalchemy import and_, bindparam, select
 from sqlalchemy.orm import Session
 
-from app.storage.walrus import WalrusClient
+from app.storage.walrus import WalrusClient, get_walrus_client
 from app.storage.schemas import WalrusStoreResponse
 from app.core.database import get_session
+from app.core.constants import (
+    WALRUS_DOWNLOAD_CACHE_DIR,
+    WALRUS_DOWNLOAD_CACHE_TTL_SECONDS,
+    WALRUS_X_ACCEL_ENABLED,
+    WALRUS_X_ACCEL_PREFIX,
+)
 from app.campaigns.models import Campaign, Contribution
 
 router = APIRouter(
@@ -26,16 +37,127 @@ CAMPAIGN_TYPE_TO_EXTENSION = {
     
 }
 DEFAULT_FILE_EXTENSION = ".dat"
+UPLOAD_CHUNK_SIZE = 1 << 17  # 128 KiB reads when forwarding an upload to Walrus
+DOWNLOAD_CHUNK_SIZE = 1 << 17  # 128 KiB chunks when relaying a blob to the client
 
-def _remove_temp_directory(temp_dir_path: str):
-    """Safely removes a directory tree."""
-    try:
-        shutil.rmtree(temp_dir_path)
-        # print(f"DEBUG: Successfully removed temporary directory: {temp_dir_path}") # Optional: for debugging
-    except OSError as e: # More specific exception for file system errors
-        # print(f"DEBUG: Error removing temporary directory {temp_dir_path}: {e}") # Optional: for debugging
-        # Consider logging this error if it occurs
-        pass
+# MIME lookups are resolved once per process instead of on every download.
+mimetypes.init()
+CONTRIBUTION_MIME_TYPES = (
+    "text/csv", "text/plain", "application/pdf", "application/json",
+    "image/png", "image/jpeg", "audio/mpeg", "video/mp4", "application/zip",
+)
+_EXT_FOR_TYPE = {
+    mime_type: extension
+    for mime_type in CONTRIBUTION_MIME_TYPES
+    if (extension := mimetypes.guess_extension(mime_type))
+}
+_TYPE_FOR_EXT = dict(mimetypes.types_map)
+
+def _media_type_for_filename(filename: str) -> str:
+    extension = os.path.splitext(filename)[1]
+    return _TYPE_FOR_EXT.get(extension) or _TYPE_FOR_EXT.get(extension.lower()) or "application/octet-stream"
+
+@lru_cache(maxsize=4096)
+def _derive_download_filename(blob_id: str, db_file_type: Optional[str]) -> Tuple[str, str]:
+    """
+    Client-facing filename and media type for a blob: the blob id's stem plus the
+    extension implied by the contribution's file_type (an extension or a MIME type).
+    """
+    extension = ""
+    if db_file_type:
+        if db_file_type.startswith("."):
+            extension = db_file_type
+        else:
+            # Uncommon types still fall back to a live mimetypes lookup
+            extension = _EXT_FOR_TYPE.get(db_file_type) or mimetypes.guess_extension(db_file_type) or ""
+
+    filename_base = Path(blob_id).name
+    base_name_part, _ = os.path.splitext(filename_base)
+    filename = (base_name_part or filename_base) + extension
+    if not filename.strip() or filename == extension:
+        filename = f"downloaded_file{extension}"
+    return filename, _media_type_for_filename(filename)
+
+# Campaign and contribution in one round-trip. The outer join keeps the campaign row when the
+# contribution is missing (contribution_id comes back NULL), so both 404s stay distinguishable.
+_SELECT_DOWNLOAD_CONTRIBUTION = (
+    select(Campaign.title, Contribution.contribution_id, Contribution.data_url, Contribution.file_type)
+    .outerjoin(Contribution, and_(
+        Contribution.campaign_id == Campaign.id,
+        Contribution.onchain_contribution_id == bindparam("onchain_contribution_id"),
+    ))
+    .where(Campaign.onchain_campaign_id == bindparam("onchain_campaign_id"))
+)
+
+async def _x_accel_download(walrus_client: WalrusClient, blob_id: str, filename: str, media_type: str) -> Response:
+    """
+    Hands delivery of a blob to nginx: the blob is fetched into the shared download
+    cache (once per blob, blobs are immutable) and nginx streams it from disk.
+    """
+    cached_file = Path(WALRUS_DOWNLOAD_CACHE_DIR) / blob_id / filename
+    if cached_file.is_file():
+        os.utime(cached_file)  # Mark as recently used so prune_download_cache keeps it
+    else:
+        cached_file.parent.mkdir(parents=True, exist_ok=True)
+        # Fetch under a private name and rename into place so nginx never serves a partial file
+        partial_file = cached_file.with_name(f".{filename}.{uuid.uuid4().hex}.part")
+        try:
+            await walrus_client.read_blob(blob_id=blob_id, output_path=partial_file)
+            if partial_file.stat().st_size == 0:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to retrieve or save blob '{blob_id}' to temporary storage."
+                )
+            os.replace(partial_file, cached_file)
+        finally:
+            partial_file.unlink(missing_ok=True)
+
+    return Response(
+        status_code=200,
+        headers={
+            "X-Accel-Redirect": quote(f"{WALRUS_X_ACCEL_PREFIX}{blob_id}/{filename}"),
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Type": media_type,
+        },
+    )
+
+def prune_download_cache(max_age_seconds: int = WALRUS_DOWNLOAD_CACHE_TTL_SECONDS) -> int:
+    """
+    Deletes cached blobs (and abandoned .part files) not used for max_age_seconds,
+    then any blob directories left empty. Returns the number of files removed.
+    """
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    cache_dir = Path(WALRUS_DOWNLOAD_CACHE_DIR)
+    if not cache_dir.is_dir():
+        return 0
+    for blob_dir in cache_dir.iterdir():
+        if not blob_dir.is_dir():
+            continue
+        for cached_file in blob_dir.iterdir():
+            try:
+                if cached_file.stat().st_mtime < cutoff:
+                    cached_file.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        try:
+            blob_dir.rmdir()  # Only succeeds once the directory is empty
+        except OSError:
+            pass
+    return removed
+
+async def run_download_cache_pruner():
+    """Background loop (started by the app lifespan) that keeps the X-Accel download cache bounded"""
+    interval = max(60, WALRUS_DOWNLOAD_CACHE_TTL_SECONDS // 4)
+    while True:
+        try:
+            removed = await asyncio.to_thread(prune_download_cache)
+            if removed:
+                logger.info("Pruned %d cached Walrus downloads", removed)
+        except Exception as e:
+            logger.error("Error pruning Walrus download cache: %s", e)
+        await asyncio.sleep(interval)
 
 @router.post("/upload")
 async def upload_file_to_walrus(
@@ -43,15 +165,19 @@ async def upload_file_to_walrus(
     epochs: Optional[int] = Query(None, description="Number of storage epochs"),
     send_object_to: Optional[str] = Query(None, description="Sui address to transfer the Blob object to"),
     deletable: bool = Query(False, description="Store as a deletable blob"),
+    walrus_client: WalrusClient = Depends(get_walrus_client),
 ) -> WalrusStoreResponse:
     """
     Uploads a file to Walrus storage.
     """
     try:
-        walrus_client = WalrusClient()
-        contents = await file.read()
-        response = await walrus_client.store_blob(
-            data=contents,
+        async def _file_chunks():
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+        response = await walrus_client.store_blob_stream(
+            _file_chunks(),
+            content_length=file.size,
             epochs=epochs,
             send_object_to=send_object_to,
             deletable=deletable,
@@ -64,42 +190,37 @@ async def upload_file_to_walrus(
 
 @router.get("/download") # Route changed, no {blob_id} here
 async def download_file_from_walrus(
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
+    walrus_client: WalrusClient = Depends(get_walrus_client),
     onchain_campaign_id: Optional[str] = None,
     onchain_contribution_id: Optional[str] = None, # New query param
-) -> FileResponse:
+) -> Response:
     """
-    Downloads a file from Walrus to a temporary server location,
-    then streams it to the client. Cleans up the temporary file afterwards.
+    Streams a contribution's file from Walrus to the client as the aggregator sends it.
+
+    With WALRUS_X_ACCEL_ENABLED (API only reachable through nginx), the blob is
+    cached on disk and delivery is handed off with X-Accel-Redirect instead.
     """
     print(f"Attempting download for contribution onchain_id: {onchain_contribution_id}, campaign onchain_id: {onchain_campaign_id}")
-    temp_dir_path: Optional[str] = None
 
     if not onchain_campaign_id:
         raise HTTPException(status_code=400, detail="onchain_campaign_id query parameter is required.")
     if not onchain_contribution_id:
         raise HTTPException(status_code=400, detail="onchain_contribution_id query parameter is required.")
 
-    campaign = db.query(Campaign).filter(Campaign.onchain_campaign_id == onchain_campaign_id).first()
-    if campaign is None:
-        raise HTTPException(status_code=404, detail=f"Campaign not found for onchain_campaign_id: {onchain_campaign_id}")
-    
-    actual_contribution = db.query(Contribution).filter(
-        Contribution.campaign_id == campaign.id,
-        Contribution.onchain_contribution_id == onchain_contribution_id,
+    actual_contribution = db.execute(
+        _SELECT_DOWNLOAD_CONTRIBUTION,
+        {"onchain_campaign_id": onchain_campaign_id, "onchain_contribution_id": onchain_contribution_id},
     ).first()
+    if actual_contribution is None:
+        raise HTTPException(status_code=404, detail=f"Campaign not found for onchain_campaign_id: {onchain_campaign_id}")
     
-    # Corrected order: Check if actual_contribution is None BEFORE accessing its attributes
-    if not actual_contribution:
-        raise HTTPException(status_code=404, detail=f"Contribution with onchain_id '{onchain_contribution_id}' not found for campaign '{campaign.title}'.")
+    if actual_contribution.contribution_id is None:
+        raise HTTPException(status_code=404, detail=f"Contribution with onchain_id '{onchain_contribution_id}' not found for campaign '{actual_contribution.title}'.")
 
     print(f"Found actual contribution. DB file_type: {actual_contribution.file_type}") # Now safe to access
     
     try:
-        temp_dir_path = tempfile.mkdtemp(prefix="walrus_dl_")
-        print(f"Created temporary directory: {temp_dir_path}")
-
         if not actual_contribution.data_url:
             raise HTTPException(status_code=404, detail=f"Contribution '{onchain_contribution_id}' does not have a data_url.")
         
@@ -108,71 +229,28 @@ async def download_file_from_walrus(
             raise HTTPException(status_code=400, detail=f"Could not derive a valid blob_id from data_url for contribution '{onchain_contribution_id}'.")
         print(f"Derived Blob ID from data_url: {blob_id}")
 
-        filename_base_from_blob = Path(blob_id).name
-        print(f"Filename base from blob: {filename_base_from_blob}")
-        
-        db_file_type = actual_contribution.file_type
-        print(f"Database file_type for actual_contribution (re-confirm): {db_file_type}")
-        
-        final_derived_extension = ""
-        if db_file_type:
-            if db_file_type.startswith("."):
-                final_derived_extension = db_file_type
-            else:
-                guessed_ext = mimetypes.guess_extension(db_file_type)
-                if guessed_ext:
-                    final_derived_extension = guessed_ext
-        print(f"Derived final extension: '{final_derived_extension}'")
-
-        base_name_part, _ = os.path.splitext(filename_base_from_blob)
-        print(f"Base name part from blob: '{base_name_part}'")
-
-        if not base_name_part and filename_base_from_blob.startswith("."):
-            user_download_filename = filename_base_from_blob + final_derived_extension
-        elif base_name_part:
-            user_download_filename = base_name_part + final_derived_extension
-        else: 
-            user_download_filename = filename_base_from_blob + final_derived_extension
-        print(f"Constructed filename (1st pass): '{user_download_filename}'")
-
-        if not user_download_filename.strip() or user_download_filename == final_derived_extension:
-            user_download_filename = f"downloaded_file{final_derived_extension}"
-            if not Path(user_download_filename).stem and final_derived_extension:
-                 user_download_filename = f"file{final_derived_extension}"
+        user_download_filename, media_type_for_response = _derive_download_filename(blob_id, actual_contribution.file_type)
         print(f"User download filename for client (final): '{user_download_filename}'")
 
-        temp_file_on_server = Path(temp_dir_path) / user_download_filename
-        print(f"Temporary file on server: {temp_file_on_server}")
-
-        async with WalrusClient() as walrus_client:
-            await walrus_client.read_blob(blob_id=blob_id, output_path=temp_file_on_server)
-            print(f"Downloaded file to temporary path: {temp_file_on_server}")
-
-        if not temp_file_on_server.is_file() or temp_file_on_server.stat().st_size == 0:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to retrieve or save blob '{blob_id}' to temporary storage."
-            )
-
-        # Add cleanup task to BackgroundTasks object
-        background_tasks.add_task(_remove_temp_directory, temp_dir_path)
-        print(f"Scheduled cleanup for directory: {temp_dir_path}")
+        if WALRUS_X_ACCEL_ENABLED:
+            return await _x_accel_download(walrus_client, blob_id, user_download_filename, media_type_for_response)
 
-        media_type_for_response, _ = mimetypes.guess_type(user_download_filename)
-        if not media_type_for_response:
-            media_type_for_response = 'application/octet-stream'
+        blob_response = await walrus_client.open_blob_stream(blob_id)
+        # Relay the body exactly as the aggregator sent it (no decompression), so its
+        # Content-Length and Content-Encoding still describe the bytes the client receives
+        headers = {"Content-Disposition": f'attachment; filename="{user_download_filename}"'}
+        for header in ("Content-Length", "Content-Encoding"):
+            if header in blob_response.headers:
+                headers[header] = blob_response.headers[header]
 
-        # Remove background_tasks argument from FileResponse constructor
-        return FileResponse(
-            path=str(temp_file_on_server),
-            filename=user_download_filename,
-            media_type=media_type_for_response
-            # No background_tasks=background_tasks here
+        return StreamingResponse(
+            blob_response.aiter_raw(DOWNLOAD_CHUNK_SIZE),
+            media_type=media_type_for_response,
+            headers=headers,
+            background=BackgroundTask(blob_response.aclose)
         )
 
     except httpx.HTTPStatusError as e: # Ensure httpx is imported if you use it
-        if temp_dir_path:
-            _remove_temp_directory(temp_dir_path) 
         if e.response.status_code == 404:
             raise HTTPException(status_code=404, detail=f"Blob with ID '{blob_id}' not found in Walrus storage.")
         else:
@@ -181,18 +259,11 @@ async def download_file_from_walrus(
                 detail=f"Error from Walrus storage while retrieving blob '{blob_id}': {e.response.text}"
             )
     except httpx.HTTPError as e: # Ensure httpx is imported
-        if temp_dir_path:
-            _remove_temp_directory(temp_dir_path)
         raise HTTPException(
             status_code=503, 
             detail=f"Network error while attempting to retrieve blob '{blob_id}' from Walrus storage."
         )
     except Exception as e:
-        if temp_dir_path:
-            # For unhandled exceptions, ensure cleanup is attempted.
-            # Calling it directly here means it runs before the 500 response fully leaves,
-            # which is generally okay for cleanup on error.
-            _remove_temp_directory(temp_dir_path) 
         print(f"Unexpected server error processing blob_id (derived as {blob_id if 'blob_id' in locals() else 'N/A'}): {type(e).__name__} - {e}")
         raise HTTPException(
             status_code=500,
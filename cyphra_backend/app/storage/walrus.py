@@ -1,12 +1,19 @@
+import aiofiles
 import httpx
-from typing import Optional, Dict, Union
+from typing import AsyncIterable, Optional, Dict, Union
 from pathlib import Path
+from fastapi import Request
 
 from app.storage.schemas import (
     WalrusStoreResponse,
 )
 from app.core.constants import AGGREGATOR_URL, PUBLISHER_URL
 
+BLOB_WRITE_CHUNK_SIZE = 1 << 17  # read_blob copies to output_path in 128 KiB chunks
+# Shared app client: no read timeout, so long blob streams aren't cut off between chunks
+WALRUS_HTTP_TIMEOUT = httpx.Timeout(15.0, connect=5.0, read=None)
+WALRUS_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
 class WalrusClient:
     """
     A Python client for interacting with the Walrus HTTP API using httpx.
@@ -15,7 +22,10 @@ class WalrusClient:
     def __init__(
         self,
         aggregator_url: str = AGGREGATOR_URL, 
-        publisher_url: str = PUBLISHER_URL
+        publisher_url: str = PUBLISHER_URL,
+        timeout: Union[httpx.Timeout, float, None] = httpx.Timeout(5.0),
+        limits: httpx.Limits = httpx.Limits(),
+        http2: bool = False,
     ):
         """
         Initializes the WalrusClient with the URLs for the aggregator and publisher.
@@ -23,10 +33,11 @@ class WalrusClient:
         Args:
             aggregator_url: The URL of the Walrus aggregator (e.g., "http://localhost:8080").
             publisher_url: The URL of the Walrus publisher (e.g., "http://localhost:8081").
+            timeout, limits, http2: Passed through to the underlying httpx.AsyncClient.
         """
         self.aggregator_url = aggregator_url.rstrip('/')
         self.publisher_url = publisher_url.rstrip('/')
-        self.client = httpx.AsyncClient()
+        self.client = httpx.AsyncClient(timeout=timeout, limits=limits, http2=http2)
 
     async def __aenter__(self):
         return self
@@ -52,16 +63,9 @@ class WalrusClient:
         ... (rest of the docstring) ...
         """
         url = f"{self.publisher_url}/v1/blobs"
-        params = {}
+        params = self._store_params(epochs, send_object_to, deletable)
         files = {} # To store file objects if data is a Path
 
-        if epochs is not None:
-            params["epochs"] = epochs
-        if send_object_to is not None:
-            params["send_object_to"] = send_object_to
-        if deletable:
-            params["deletable"] = "true" # Send as string "true" if API expects that
-
         # Prepare data or files
         actual_data_to_send = None
         if isinstance(data, str):
@@ -113,6 +117,58 @@ class WalrusClient:
             if "file" in files and files["file"]:
                 files["file"].close()
 
+    async def store_blob_stream(
+        self,
+        body: AsyncIterable[bytes],
+        content_length: Optional[int] = None,
+        epochs: Optional[int] = None,
+        send_object_to: Optional[str] = None,
+        deletable: bool = False,
+    ) -> WalrusStoreResponse:
+        """
+        Stores a blob in Walrus by streaming the request body to the publisher.
+
+        Chunks are forwarded as they are produced, so the blob is never held in
+        memory as a whole.
+
+        Args:
+            body: Async iterable yielding the blob's bytes.
+            content_length: Total size in bytes, if known; otherwise the body is sent chunked.
+            epochs, send_object_to, deletable: As for store_blob.
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+        """
+        url = f"{self.publisher_url}/v1/blobs"
+        params = self._store_params(epochs, send_object_to, deletable)
+        headers = {"Content-Length": str(content_length)} if content_length is not None else None
+
+        response = await self.client.put(
+            url,
+            params=params,
+            content=body,
+            headers=headers,
+            timeout=httpx.Timeout(10.0, read=60.0)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _store_params(
+        epochs: Optional[int],
+        send_object_to: Optional[str],
+        deletable: bool,
+    ) -> Dict[str, Union[int, str]]:
+        """Query parameters for a publisher PUT /v1/blobs"""
+        params = {}
+        if epochs is not None:
+            params["epochs"] = epochs
+        if send_object_to is not None:
+            params["send_object_to"] = send_object_to
+        if deletable:
+            params["deletable"] = "true" # Send as string "true" if API expects that
+        return params
+
     async def read_blob(
         self,
         blob_id: str,
@@ -135,12 +191,19 @@ class WalrusClient:
         """
         url = f"{self.aggregator_url}/v1/blobs/{blob_id}"
         try:
+            if output_path:
+                # Copy chunk by chunk so a large blob is never materialised as one bytes object
+                response = await self.open_blob_stream(blob_id)
+                try:
+                    async with aiofiles.open(output_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(BLOB_WRITE_CHUNK_SIZE):
+                            await f.write(chunk)
+                finally:
+                    await response.aclose()
+                return None
             response = await self.client.get(url)
             response.raise_for_status()
             content = response.content
-            if output_path:
-                with open(output_path, "wb") as f: f.write(content)
-                return None
             try: # Attempt to decode only if not writing to file
                 return content.decode("utf-8")
             except UnicodeDecodeError:
@@ -150,6 +213,25 @@ class WalrusClient:
             # print(f"Response content: {e.response.text}")
             raise
 
+    async def open_blob_stream(self, blob_id: str) -> httpx.Response:
+        """
+        Starts reading a blob from the aggregator without loading its body.
+
+        The status is checked before returning, so a missing blob raises here rather
+        than part-way through a stream. The caller iterates `aiter_bytes()` on the
+        returned response and must `aclose()` it when done.
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+        """
+        request = self.client.build_request("GET", f"{self.aggregator_url}/v1/blobs/{blob_id}")
+        response = await self.client.send(request, stream=True)
+        if response.is_error:
+            await response.aread() # Keep the error body available as response.text
+            await response.aclose()
+            response.raise_for_status()
+        return response
+
     async def get_api_specification(self) -> Dict:
         """
         Retrieves the Walrus API specification from the aggregator.
@@ -168,4 +250,14 @@ class WalrusClient:
         except httpx.HTTPError as e:
             print(f"Error retrieving API specification: {e}")
             print(f"Response content: {e.response.text}")
-            raise
\ No newline at end of file
+            raise
+
+
+def create_walrus_client() -> WalrusClient:
+    """Builds the process-wide pooled Walrus client (owned by the app lifespan)."""
+    return WalrusClient(timeout=WALRUS_HTTP_TIMEOUT, limits=WALRUS_HTTP_LIMITS, http2=True)
+
+
+async def get_walrus_client(request: Request) -> WalrusClient:
+    """FastAPI dependency returning the shared Walrus client stored on app.state."""
+    return request.app.state.walrus
@@ -3,16 +3,21 @@ Walrus API Routes for Cyphra
 Handles HTTP endpoints for Walrus blob storage operations
 """
 
+import asyncio
+import hashlib
 import logging
 import tempfile
 import os
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
+import aiofiles
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, BackgroundTasks
 from fastapi.responses import Response, FileResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_session
+from app.campaigns.models import Contribution
 from app.walrus.service import WalrusService
 from app.walrus.schemas import (
     WalrusUploadResponse, 
@@ -25,6 +30,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/walrus", tags=["walrus"])
 
+WALRUS_STREAM_CHUNK_SIZE = 1 << 17  # 128 KiB reads when forwarding an upload to Walrus
+IN_MEMORY_UPLOAD_MAX_BYTES = 5 << 20  # Dataset files smaller than this skip the temp file
+
 def get_walrus_service() -> WalrusService:
     """Get Walrus service instance with configuration"""
     from app.core.config import get_walrus_config
@@ -35,7 +43,6 @@ async def store_file(
     campaign_id: str = Form(...),
     file: UploadFile = File(...),
     epochs: int = Form(5),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     db: Session = Depends(get_session)
 ):
     """Store a single file on Walrus network"""
@@ -45,53 +52,44 @@ async def store_file(
     
     walrus_service = get_walrus_service()
     
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-        try:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-            
-            logger.info(f"Storing file {file.filename} for campaign {campaign_id}")
+    # Hash and size the upload in the same pass that forwards it to Walrus
+    file_hash = hashlib.sha256()
+    file_size = 0
+    
+    async def _file_chunks():
+        nonlocal file_size
+        while chunk := await file.read(WALRUS_STREAM_CHUNK_SIZE):
+            file_hash.update(chunk)
+            file_size += len(chunk)
+            yield chunk
+    
+    try:
+        logger.info(f"Storing file {file.filename} for campaign {campaign_id}")
+        
+        # Store on Walrus
+        blob_id = await walrus_service.store_stream(_file_chunks(), file.filename, epochs)
+        
+        if blob_id:
+            # TODO: Update campaign with blob_id in database
+            # This would call the smart contract function add_walrus_blob
             
-            # Store on Walrus
-            blob_id = await walrus_service.store_blob(temp_file_path, epochs)
+            return WalrusUploadResponse(
+                success=True,
+                blob_id=blob_id,
+                file_size=file_size,
+                filename=file.filename,
+                content_type=file.content_type,
+                epochs=epochs,
+                file_hash=file_hash.hexdigest()
+            )
+        else:
+            raise HTTPException(status_code=500, detail="Failed to store file on Walrus")
             
-            if blob_id:
-                # Store metadata with file info
-                metadata = {
-                    "campaign_id": campaign_id,
-                    "original_filename": file.filename,
-                    "content_type": file.content_type,
-                    "epochs": epochs
-                }
-                
-                file_info = await walrus_service.store_file_with_metadata(temp_file_path, metadata)
-                
-                # Clean up in background
-                background_tasks.add_task(os.unlink, temp_file_path)
-                
-                # TODO: Update campaign with blob_id in database
-                # This would call the smart contract function add_walrus_blob
-                
-                return WalrusUploadResponse(
-                    success=True,
-                    blob_id=blob_id,
-                    file_size=len(content),
-                    filename=file.filename,
-                    content_type=file.content_type,
-                    epochs=epochs,
-                    file_hash=file_info["file_hash"] if file_info else None
-                )
-            else:
-                raise HTTPException(status_code=500, detail="Failed to store file on Walrus")
-                
-        except Exception as e:
-            logger.error(f"Error storing file: {e}")
-            # Clean up temp file on error
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-            raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error storing file: {e}")
+        raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
 
 @router.get("/retrieve/{blob_id}")
 async def retrieve_file(blob_id: str):
@@ -166,25 +164,33 @@ async def store_campaign_dataset(
     
     walrus_service = get_walrus_service()
     temp_files = []
+    spooled_files = []  # Every temp file created, for cleanup even if a sibling spool fails
+    
+    async def _spool(file: UploadFile) -> Tuple[str, Union[str, bytes]]:
+        """(filename, content) for small files, (filename, temp file path) for the rest"""
+        if file.size is not None and file.size < IN_MEMORY_UPLOAD_MAX_BYTES:
+            return file.filename, await file.read()
+        async with aiofiles.tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
+            spooled_files.append(temp_file.name)
+            while chunk := await file.read(WALRUS_STREAM_CHUNK_SIZE):
+                await temp_file.write(chunk)
+            return file.filename, temp_file.name
     
     try:
-        # Save all files temporarily
-        for file in files:
-            if not file.filename:
-                continue
-                
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-                content = await file.read()
-                temp_file.write(content)
-                temp_files.append(temp_file.name)
+        # Save all files temporarily, concurrently and without blocking the event loop
+        spooled = await asyncio.gather(*(_spool(file) for file in files if file.filename), return_exceptions=True)
+        for result in spooled:
+            if isinstance(result, BaseException):
+                raise result
+        temp_files = [content for _, content in spooled if isinstance(content, str)]
         
-        if not temp_files:
+        if not spooled:
             raise HTTPException(status_code=400, detail="No valid files to process")
         
-        logger.info(f"Storing dataset for campaign {campaign_id} with {len(temp_files)} files")
+        logger.info(f"Storing dataset for campaign {campaign_id} with {len(spooled)} files")
         
         # Store as dataset
-        blob_id = await walrus_service.store_campaign_dataset(campaign_id, temp_files)
+        blob_id = await walrus_service.store_campaign_dataset(campaign_id, spooled)
         
         if blob_id:
             # Clean up temp files in background
@@ -206,7 +212,7 @@ async def store_campaign_dataset(
     except Exception as e:
         logger.error(f"Error storing dataset: {e}")
         # Clean up temp files on error
-        for temp_file in temp_files:
+        for temp_file in spooled_files:
             if os.path.exists(temp_file):
                 os.unlink(temp_file)
         raise HTTPException(status_code=500, detail=f"Dataset storage error: {str(e)}")
@@ -218,9 +224,14 @@ async def get_campaign_blobs(
 ):
     """Get all blobs associated with a campaign"""
     
-    # TODO: Query database for campaign blob IDs
-    # For now, return empty list
-    blob_ids = []  # This would come from the database
+    # One statement for every contribution's blob; campaign_id is the internal id, so no join is needed
+    data_urls = db.execute(
+        select(Contribution.data_url).where(
+            Contribution.campaign_id == campaign_id,
+            Contribution.data_url.isnot(None)
+        )
+    ).scalars().all()
+    blob_ids = [blob_id for blob_id in (data_url.split("/")[-1] for data_url in data_urls) if blob_id]
     
     if not blob_ids:
         return {"campaign_id": campaign_id, "blobs": []}
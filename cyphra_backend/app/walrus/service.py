@@ -7,7 +7,7 @@ import asyncio
 import aiohttp
 import json
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple, Union
 from pathlib import Path
 import tempfile
 import os
@@ -17,6 +17,18 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+BLOB_INFO_CONCURRENCY = 16  # Parallel HEAD probes per list_campaign_blobs call
+
+def _unique_arcname(arcname: str, taken: set) -> str:
+    """arcname, or arcname with a " (n)" suffix on the stem if it is already in taken; records the result"""
+    stem, suffix = os.path.splitext(arcname)
+    candidate, n = arcname, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{stem} ({n}){suffix}"
+    taken.add(candidate)
+    return candidate
+
 class WalrusService:
     def __init__(self, config: Dict[str, Any]):
         self.aggregator_url = config["aggregator"]
@@ -32,16 +44,32 @@ class WalrusService:
         try:
             with open(file_path, 'rb') as f:
                 file_data = f.read()
-            
+        except Exception as e:
+            logger.error(f"Exception storing blob: {e}")
+            return None
+        
+        logger.info(f"Storing blob to Walrus: {Path(file_path).name} ({len(file_data)} bytes)")
+        return await self._put_blob(file_data, Path(file_path).name, epochs)
+    
+    async def store_stream(self, chunks: AsyncIterator[bytes], filename: str, epochs: int = 5) -> Optional[str]:
+        """
+        Store a blob on Walrus network from an async iterator of byte chunks,
+        forwarding each chunk as it arrives instead of buffering the whole file
+        Returns blob_id if successful, None otherwise
+        """
+        logger.info(f"Streaming blob to Walrus: {filename}")
+        return await self._put_blob(chunks, filename, epochs)
+    
+    async def _put_blob(self, body: Union[bytes, AsyncIterator[bytes]], filename: str, epochs: int) -> Optional[str]:
+        """Upload a blob body to the publisher; returns blob_id if successful, None otherwise"""
+        try:
             async with aiohttp.ClientSession() as session:
                 data = aiohttp.FormData()
-                data.add_field('file', file_data, filename=Path(file_path).name)
+                data.add_field('file', body, filename=filename)
                 
                 url = f"{self.publisher_url}/v1/store"
                 params = {"epochs": epochs}
                 
-                logger.info(f"Storing blob to Walrus: {Path(file_path).name} ({len(file_data)} bytes)")
-                
                 async with session.put(url, data=data, params=params) as response:
                     if response.status == 200:
                         result = await response.json()
@@ -120,21 +148,31 @@ class WalrusService:
                 "error": str(e)
             }
     
-    async def store_campaign_dataset(self, campaign_id: str, file_paths: List[str]) -> Optional[str]:
+    async def store_campaign_dataset(
+        self,
+        campaign_id: str,
+        files: List[Tuple[str, Union[str, bytes]]]
+    ) -> Optional[str]:
         """
         Store multiple files as a campaign dataset
         Creates a ZIP archive and stores it on Walrus
+        files holds (original filename, path on disk or in-memory content) pairs
         """
         try:
             with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_zip:
                 logger.info(f"Creating dataset archive for campaign {campaign_id}")
                 
+                arcnames = set()
                 with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for file_path in file_paths:
-                        if os.path.exists(file_path):
-                            arcname = f"{campaign_id}/{Path(file_path).name}"
-                            zipf.write(file_path, arcname)
-                            logger.info(f"Added to archive: {file_path} -> {arcname}")
+                    for filename, content in files:
+                        if not isinstance(content, bytes) and not os.path.exists(content):
+                            continue
+                        arcname = _unique_arcname(f"{campaign_id}/{Path(filename).name}", arcnames)
+                        if isinstance(content, bytes):
+                            zipf.writestr(arcname, content)
+                        else:
+                            zipf.write(content, arcname)
+                        logger.info(f"Added to archive: {filename} -> {arcname}")
                 
                 blob_id = await self.store_blob(temp_zip.name, epochs=10)
                 os.unlink(temp_zip.name)  # Clean up temp file
@@ -209,10 +247,14 @@ class WalrusService:
         """
         Get information about multiple blobs for a campaign
         """
-        results = []
+        semaphore = asyncio.Semaphore(BLOB_INFO_CONCURRENCY)
         
-        for blob_id in blob_ids:
-            info = await self.get_blob_info(blob_id)
+        async def _probe(blob_id: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_blob_info(blob_id)
+        
+        results = []
+        for info in await asyncio.gather(*(_probe(blob_id) for blob_id in blob_ids)):
             if info:
                 info["campaign_id"] = campaign_id
                 results.append(info)
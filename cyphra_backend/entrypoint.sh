@@ -4,7 +4,7 @@
 alembic upgrade head
 
 # Start Celery in the background
-su -c 'celery -A app.celery.celery worker --beat --loglevel=info --logfile=celery.log &' appuser
+su -c 'celery -A app.celery.celery worker --beat -Q celery,hf_checks --loglevel=info --logfile=celery.log &' appuser
 
 # Start Uvicorn server
 exec "$@"
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Round-trip tests for Shamir sharing of Seal data keys"""
+
+import itertools
+import os
+
+import pytest
+
+from app.seal import _shamir
+
+
+@pytest.mark.parametrize("shares,threshold", [(1, 1), (3, 2), (5, 3), (5, 5)])
+def test_any_threshold_subset_recovers_secret(shares, threshold):
+    secret = os.urandom(32)
+    key_shares = _shamir.split(secret, shares, threshold)
+
+    assert len(key_shares) == shares
+    assert all(len(share) == len(secret) + 1 for share in key_shares)
+    for size in range(threshold, shares + 1):
+        for subset in itertools.combinations(key_shares, size):
+            assert _shamir.combine(list(subset)) == secret
+
+
+def test_fewer_than_threshold_shares_do_not_recover_secret():
+    secret = os.urandom(32)
+    key_shares = _shamir.split(secret, 5, 3)
+
+    for subset in itertools.combinations(key_shares, 2):
+        assert _shamir.combine(list(subset)) != secret
+
+
+def test_invalid_parameters_rejected():
+    with pytest.raises(ValueError):
+        _shamir.split(b"secret", 2, 3)
+    with pytest.raises(ValueError):
+        _shamir.split(b"secret", 256, 2)
+
+
+def test_duplicate_shares_rejected():
+    key_shares = _shamir.split(os.urandom(32), 3, 2)
+    with pytest.raises(ValueError):
+        _shamir.combine([key_shares[0], key_shares[0]])
@@ -0,0 +1,112 @@
+"""Round-trip and tamper tests for SealService.encrypt_stream / decrypt_stream"""
+
+import asyncio
+import os
+from typing import List
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from app.seal.service import STREAM_FLAG_ZSTD, SealService
+
+POLICY_ID = "policy-under-test"
+CHUNK_SIZE = 4096
+
+
+@pytest.fixture
+def seal_service():
+    return SealService(key_servers=[], threshold=2)
+
+
+async def _aiter(chunks: List[bytes]):
+    for chunk in chunks:
+        yield chunk
+
+
+def _chunks(data: bytes, size: int = CHUNK_SIZE) -> List[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _encrypt(seal_service: SealService, plaintext: bytes, key: bytes) -> bytes:
+    async def run():
+        return b"".join([frame async for frame in seal_service.encrypt_stream(_aiter(_chunks(plaintext)), key, POLICY_ID)])
+    return asyncio.run(run())
+
+
+def _decrypt(seal_service: SealService, ciphertext: bytes, key: bytes, read_size: int = 1000) -> bytes:
+    async def run():
+        return b"".join([chunk async for chunk in seal_service.decrypt_stream(_aiter(_chunks(ciphertext, read_size)), key, POLICY_ID)])
+    return asyncio.run(run())
+
+
+def _split_frames(ciphertext: bytes):
+    """(9-byte header, [4-byte length + frame ciphertext, ...])"""
+    header, rest, frames = ciphertext[:9], ciphertext[9:], []
+    while rest:
+        frame_len = 4 + int.from_bytes(rest[:4], "big")
+        frames.append(rest[:frame_len])
+        rest = rest[frame_len:]
+    return header, frames
+
+
+@pytest.mark.parametrize("plaintext,compressed", [
+    (os.urandom(5 * CHUNK_SIZE + 123), False),
+    (b"cyphra dataset row\n" * 5000, True),
+    (b"", False),
+])
+def test_round_trip(seal_service, plaintext, compressed):
+    key = os.urandom(32)
+    ciphertext = _encrypt(seal_service, plaintext, key)
+
+    assert bool(ciphertext[0] & STREAM_FLAG_ZSTD) == compressed
+    assert _decrypt(seal_service, ciphertext, key) == plaintext
+
+
+def test_wrong_key_or_policy_fails(seal_service):
+    ciphertext = _encrypt(seal_service, os.urandom(3 * CHUNK_SIZE), os.urandom(32))
+
+    with pytest.raises(InvalidTag):
+        _decrypt(seal_service, ciphertext, os.urandom(32))
+
+
+def test_dropped_final_frame_is_detected(seal_service):
+    key = os.urandom(32)
+    header, frames = _split_frames(_encrypt(seal_service, os.urandom(3 * CHUNK_SIZE), key))
+
+    with pytest.raises(ValueError):
+        _decrypt(seal_service, header + b"".join(frames[:-1]), key)
+
+
+def test_partial_frame_is_detected(seal_service):
+    key = os.urandom(32)
+    ciphertext = _encrypt(seal_service, os.urandom(3 * CHUNK_SIZE), key)
+
+    with pytest.raises(ValueError):
+        _decrypt(seal_service, ciphertext[:-10], key)
+
+
+def test_reordered_frames_are_detected(seal_service):
+    key = os.urandom(32)
+    header, frames = _split_frames(_encrypt(seal_service, os.urandom(3 * CHUNK_SIZE), key))
+    frames[0], frames[1] = frames[1], frames[0]
+
+    with pytest.raises(InvalidTag):
+        _decrypt(seal_service, header + b"".join(frames), key)
+
+
+def test_appended_frame_is_detected(seal_service):
+    key = os.urandom(32)
+    ciphertext = _encrypt(seal_service, os.urandom(3 * CHUNK_SIZE), key)
+    _, frames = _split_frames(ciphertext)
+
+    with pytest.raises(ValueError):
+        _decrypt(seal_service, ciphertext + frames[0], key)
+
+
+def test_flipped_ciphertext_byte_is_detected(seal_service):
+    key = os.urandom(32)
+    ciphertext = bytearray(_encrypt(seal_service, os.urandom(3 * CHUNK_SIZE), key))
+    ciphertext[20] ^= 0x01
+
+    with pytest.raises(InvalidTag):
+        _decrypt(seal_service, bytes(ciphertext), key)